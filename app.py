@@ -1,10 +1,18 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, g, jsonify, send_from_directory
 from datetime import datetime
 from functools import wraps
+from markupsafe import Markup
+import gzip
+import mimetypes
+import os
+import tempfile
+import threading
+import time
 import gspread
 
 # Import the functions from your backend script
 import backend_logic as backend
+import build_assets
 
 app = Flask(__name__)
 app.secret_key = 'your_super_secret_key_12345'
@@ -29,14 +37,201 @@ if spreadsheet:
 else:
     student_sheet, volunteer_sheet, faq_sheet, announcement_sheet, doc_response_sheet = None, None, None, None, None
 
+# Compact per-worker copy of the Students sheet for list views and dashboards,
+# kept current with edits made directly in the spreadsheet by a background sync.
+# It holds whole rows on purpose: the views, bulk-action checks, leaderboard and
+# queue estimate between them read 22 of the 25 columns, so one shared full fetch
+# replaces a projected read per page view (only Notes and two document columns
+# are carried without being needed here).
+students = backend.StudentCache(student_sheet)
+student_sync = backend.StudentSync(students)
+if student_sheet and os.environ.get('UDAAN_SYNC', '1') == '1':
+    student_sync.start()
+# Expected LHC waits, updated from the same change events
+lhc_wait = backend.QueueEstimator(students)
+
+# --- Background Compaction of Soft-Deleted Rows ---
+COMPACTION_CHECK_SECONDS = 300   # How often the compactor wakes up
+COMPACTION_QUIET_SECONDS = 900   # Only compact after this long without any request
+ACTIVITY_TOUCH_SECONDS = 30      # Requests refresh the shared activity time at most this often
+# All workers on the host share the last request time through this file's mtime,
+# so the compacting worker (or a preloading master) sees every worker's traffic.
+# This assumes the web app runs on a single host: a second host would start its own
+# compactor, blind to this host's requests. Writes that may race a compaction (the CLI,
+# apply_student_updates, delete_faq) re-check the row's ID right before writing to it.
+COMPACTION_LOCK_PATH = os.path.join(tempfile.gettempdir(), 'udaanhub_compaction.lock')
+# Compaction renumbers FAQ rows, so every worker's FAQ index (keyed by row) built before
+# this file's mtime is stale
+FAQ_COMPACTED_PATH = os.path.join(tempfile.gettempdir(), 'udaanhub_faq_compacted')
+activity_touched_at = 0
+
+def touch_activity():
+    global activity_touched_at
+    try:
+        with open(COMPACTION_LOCK_PATH, 'a'):
+            os.utime(COMPACTION_LOCK_PATH)
+        activity_touched_at = time.time()
+    except OSError as e:
+        print(f"❌ Could not record request activity: {e}")
+
+def last_activity():
+    try:
+        return os.path.getmtime(COMPACTION_LOCK_PATH)
+    except OSError:
+        return 0
+
+def faq_compacted_at():
+    try:
+        return os.path.getmtime(FAQ_COMPACTED_PATH)
+    except OSError:
+        return 0
+
+@app.before_request
+def record_activity():
+    if time.time() - activity_touched_at > ACTIVITY_TOUCH_SECONDS:
+        touch_activity()
+
+def compaction_loop():
+    """ Removes tombstoned rows in one batch per sheet whenever the app has been quiet. """
+    while True:
+        time.sleep(COMPACTION_CHECK_SECONDS)
+        for sheet in (student_sheet, volunteer_sheet, faq_sheet):
+            if not sheet: continue
+            if time.time() - last_activity() < COMPACTION_QUIET_SECONDS:
+                break
+            try:
+                # This thread has its own client; the shared one isn't thread-safe
+                removed = backend.compact_tombstones(backend.thread_worksheet(sheet))
+                if removed and sheet is student_sheet:
+                    students.apply_compaction(removed)
+                if removed and sheet is faq_sheet:
+                    with open(FAQ_COMPACTED_PATH, 'a'):
+                        os.utime(FAQ_COMPACTED_PATH)
+            except Exception as e:
+                print(f"❌ Compaction of '{sheet.title}' failed: {e}")
+
+def start_compaction_worker():
+    """ Starts the compactor in exactly one process per host (gunicorn runs several workers). """
+    if os.environ.get('UDAAN_COMPACTION', '1') != '1':
+        return
+    touch_activity() # A fresh start counts as activity
+    try:
+        import fcntl
+        global compaction_lock
+        compaction_lock = open(COMPACTION_LOCK_PATH, 'a')
+        fcntl.flock(compaction_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        pass
+    except OSError:
+        return # Another worker already owns the compactor
+    threading.Thread(target=compaction_loop, daemon=True).start()
+
+if spreadsheet:
+    start_compaction_worker()
+
+# --- Request-Scoped Concurrent Reads ---
+# GET endpoints that never render a page, so they don't need the announcement
+NO_PAGE_ENDPOINTS = {'static', 'faq_search', 'lhc_queue_estimate', 'logout', 'delete_faq', 'delete_user'}
+
+@app.before_request
+def start_parallel_reads():
+    # Views add their own independent reads to g.reads; the announcement is
+    # fetched for every page so it overlaps with the view's own sheet calls.
+    if request.endpoint == 'static':
+        return # Also keeps the session (and its Vary: Cookie) out of static responses
+    g.reads = backend.ParallelReads()
+    if (request.method == 'GET' and request.endpoint not in NO_PAGE_ENDPOINTS
+            and 'username' in session and announcement_sheet):
+        g.announcement = g.reads.submit(backend.get_announcement, announcement_sheet)
+
+@app.teardown_request
+def join_parallel_reads(exc=None):
+    if 'reads' in g:
+        g.reads.join()
+
 # --- Context Processor to make announcement available to all templates ---
 @app.context_processor
 def inject_announcement():
-    if 'username' in session and announcement_sheet:
-        announcement = backend.get_announcement(announcement_sheet)
-        return dict(announcement=announcement)
+    if 'announcement' in g:
+        return dict(announcement=g.announcement.result())
     return dict(announcement=None)
 
+# --- Fingerprinted Static Assets & Compression (see build_assets.py) ---
+ASSET_MANIFEST = build_assets.load_manifest(app.static_folder)
+ASSET_MAX_AGE_SECONDS = 365 * 24 * 3600
+GZIP_MIN_BYTES = 500 # Smaller responses aren't worth compressing
+serve_unbuilt_static = app.view_functions['static']
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    # url_for('static', filename='style.css') -> /static/dist/style.<hash>.css once built
+    if endpoint == 'static' and values.get('filename') in ASSET_MANIFEST:
+        values['filename'] = ASSET_MANIFEST[values['filename']]
+
+FINGERPRINTED_ASSETS = set(ASSET_MANIFEST.values())
+
+def serve_static(filename):
+    """ Serves built assets precompressed with immutable caching; everything else as before. """
+    if filename not in FINGERPRINTED_ASSETS:
+        return serve_unbuilt_static(filename=filename)
+    mimetype = mimetypes.guess_type(filename)[0]
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+            response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(app.static_folder, filename)
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE_SECONDS}, immutable'
+    response.vary.add('Accept-Encoding')
+    return response
+
+app.view_functions['static'] = serve_static
+
+@app.after_request
+def compress_html(response):
+    if (response.mimetype != 'text/html' or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or not request.accept_encodings['gzip']):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+# --- FAQ Search Index ---
+FAQ_INDEX_TTL_SECONDS = 300 # Periodic rebuild picks up edits made by other workers or in the sheet
+faq_index, faq_index_built_at = None, 0
+faq_index_lock = threading.Lock()
+
+def get_faq_index():
+    global faq_index, faq_index_built_at
+    with faq_index_lock:
+        drop_stale_faq_index()
+        if faq_index is None or time.time() - faq_index_built_at > FAQ_INDEX_TTL_SECONDS:
+            started = time.time() # Before the read, so a compaction finishing during it still counts
+            faq_index = backend.FaqIndex(backend.with_default_faqs(backend.get_all_faqs(faq_sheet)))
+            faq_index_built_at = started
+        return faq_index
+
+def drop_stale_faq_index():
+    """ Forgets the index if a compaction has renumbered the FAQ rows since it was built.
+    Call with faq_index_lock held. """
+    global faq_index
+    if faq_index is not None and faq_index_built_at < faq_compacted_at():
+        faq_index = None
+
+# --- Rendered Fragment Cache ---
+fragments = backend.FragmentCache()
+
+def render_fragment(template, data_version, build_context):
+    """ Renders a partial template once per (template, data version, role) and reuses the HTML.
+    build_context() only runs on a cache miss. """
+    key = (template, data_version, session.get('role'))
+    return Markup(fragments.get_or_render(key, lambda: render_template(template, **build_context())))
+
 # --- Decorators ---
 def login_required(f):
     @wraps(f)
@@ -63,12 +258,12 @@ def index():
     if not student_sheet: return "Error: Could not connect to the Student Data Sheet. Please check server logs."
     
     new_student_id = request.args.get('new_student_id')
-    all_records = backend.get_all_records_safely(student_sheet, backend.STUDENT_HEADERS)
+    frame = students.get().frame()
     stats = {
-        'total': len(all_records),
-        'completed': sum(1 for r in all_records if r.get('stage4_doaa_status') == 'Done'),
-        'in_lhc_queue': sum(1 for r in all_records if r.get('stage3_lhc_docs_status') == 'In Queue'),
-        'flagged': sum(1 for r in all_records if r.get('flagged') == 'yes')
+        'total': len(frame),
+        'completed': frame.count(frame.status_is('doaa', 'Done')),
+        'in_lhc_queue': frame.count(frame.status_is('lhc_docs', 'In Queue')),
+        'flagged': frame.count(frame.flagged)
     }
     new_faq_notification = session.pop('new_faq_added', False)
     return render_template('index.html', dashboard_stats=stats, new_student_id=new_student_id, new_faq_notification=new_faq_notification)
@@ -130,8 +325,9 @@ def update_profile():
 @login_required
 def students_list():
     if not student_sheet: return "Error: Student Sheet not connected."
-    all_students = backend.get_all_records_safely(student_sheet, backend.STUDENT_HEADERS)
-    return render_template('students_list.html', students=all_students)
+    store = students.get()
+    student_rows = render_fragment('_student_rows.html', store.version, lambda: dict(students=store))
+    return render_template('students_list.html', students=store, student_rows=student_rows, bulk_actions=backend.BULK_ACTIONS)
 
 @app.route('/search', methods=['POST'])
 @login_required
@@ -147,7 +343,7 @@ def search_student():
 @login_required
 def add_student():
     app_id, student_name = request.form['app_id'].strip(), request.form['student_name'].strip()
-    backend.add_student_from_webapp(student_sheet, app_id, student_name)
+    students.mark_rows_dirty(backend.add_student_from_webapp(student_sheet, app_id, student_name))
     flash(f"New student '{student_name}' was added successfully!", "success")
     return redirect(url_for('search_student_get', search_term=app_id))
 
@@ -159,32 +355,31 @@ def update_status():
     row_number = backend.find_student_row(student_sheet, student_id)
     if not row_number: return "Student not found."
     action_type, stage_name = action.split('_', 1)
-    stage_map = {'entry': 3, 'hostel': 6, 'insurance': 9, 'lhc_docs': 12, 'doaa': 15}
-    cols_start = stage_map.get(stage_name.replace('_done','').replace('_queue',''))
-    if not cols_start: return "Invalid action."
+    stage_key = stage_name.replace('_done','').replace('_queue','')
+    if stage_key not in backend.STAGES: return "Invalid action."
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     if action_type == 'unmark': new_status, update_by, update_ts = 'Pending', '', ''
     else:
         update_by, update_ts = volunteer_name, timestamp
         new_status = 'In Queue' if 'queue' in action else 'Done'
     
+    schema = backend.get_schema(student_sheet)
     if stage_name == 'doaa' and action_type == 'mark':
-        student_data = student_sheet.row_values(row_number)
-        if not all(s == 'Done' for s in [student_data[2], student_data[5], student_data[8], student_data[11]]):
+        student = schema.to_record(student_sheet.row_values(row_number))
+        previous_stages = ['entry', 'hostel', 'insurance', 'lhc_docs']
+        if not all(student[f'{backend.STAGES[key]}_status'] == 'Done' for key in previous_stages):
              flash("Error: All previous stages must be 'Done'.", "error")
              return redirect(url_for('search_student_get', search_term=student_id))
     
     if stage_name == 'lhc_docs' and 'done' in action:
-        student_data = student_sheet.row_values(row_number)
-        required_docs_verified = (
-            student_data[19] == 'yes' and student_data[20] == 'yes' and
-            student_data[22] == 'yes' and student_data[23] == 'yes'
-        )
+        student = schema.to_record(student_sheet.row_values(row_number))
+        required_docs_verified = all(student[backend.DOC_COLUMNS[doc]] == 'yes' for doc in backend.LHC_REQUIRED_DOCS)
         if not required_docs_verified:
             flash("Error: All required documents must be verified before marking LHC Registration as Done.", "error")
             return redirect(url_for('search_student_get', search_term=student_id))
 
-    student_sheet.update_cells([gspread.Cell(row_number, i, v) for i, v in enumerate([new_status, update_by, update_ts], start=cols_start)])
+    student_sheet.update_cells(backend.stage_cells(student_sheet, row_number, stage_key, new_status, update_by, update_ts))
+    students.mark_rows_dirty(row_number)
     flash(f"Status for {student_id} updated.", "success")
     return redirect(url_for('search_student_get', search_term=student_id))
 
@@ -194,7 +389,8 @@ def update_note():
     student_id, notes = request.form['student_id'], request.form['notes']
     row_number = backend.find_student_row(student_sheet, student_id)
     if not row_number: return "Student not found."
-    student_sheet.update_cell(row_number, 18, notes)
+    student_sheet.update_cell(row_number, backend.get_schema(student_sheet).col('Notes'), notes)
+    students.mark_rows_dirty(row_number)
     flash("Note updated successfully.", "success")
     return redirect(url_for('search_student_get', search_term=student_id))
 
@@ -211,8 +407,12 @@ def update_student_details():
     if not row_number:
         flash(f"Could not find original student '{original_id}'.", "error")
         return redirect(url_for('index'))
-    student_sheet.update_cell(row_number, 1, new_id)
-    student_sheet.update_cell(row_number, 2, new_name)
+    schema = backend.get_schema(student_sheet)
+    student_sheet.update_cells([
+        gspread.Cell(row_number, schema.col('student_identifier'), new_id),
+        gspread.Cell(row_number, schema.col('student_name'), new_name)
+    ])
+    students.mark_rows_dirty(row_number)
     flash("Student details updated successfully.", "success")
     return redirect(url_for('search_student_get', search_term=new_id))
     
@@ -221,7 +421,7 @@ def update_student_details():
 def flag_student():
     student_id, current_flag = request.form['student_id'], request.form.get('current_flag', 'no')
     new_flag = 'no' if current_flag == 'yes' else 'yes'
-    backend.update_student_flag(student_sheet, student_id, new_flag)
+    students.mark_rows_dirty(backend.update_student_flag(student_sheet, student_id, new_flag))
     flash_message = f"Flag for student {student_id} has been removed." if new_flag == 'no' else f"Student {student_id} has been flagged for assistance."
     flash(flash_message, "success")
     return redirect(url_for('search_student_get', search_term=student_id))
@@ -230,21 +430,45 @@ def flag_student():
 @login_required
 def search_student_get():
     search_term = request.args.get('search_term')
-    row_number = backend.find_student_row(student_sheet, search_term)
+    # The document checklist doesn't depend on the student row, so fetch it concurrently
+    doc_future = g.reads.submit(backend.get_document_responses, doc_response_sheet, search_term, default=[]) if doc_response_sheet else None
+
+    # A loaded student store saves the find() round trip; its row is re-checked below
+    store = students.peek()
+    cached_student = store.find(search_term) if store else None
+    row_number = cached_student.row_id if cached_student else backend.find_student_row(student_sheet, search_term)
     if not row_number: return f"Student '{search_term}' not found. <a href='/'>Go back</a>."
-    student_data_list = student_sheet.row_values(row_number)
-    student_dict = dict(zip(backend.STUDENT_HEADERS, student_data_list))
-    doc_responses = backend.get_document_responses(doc_response_sheet, search_term)
+    schema = backend.get_schema(student_sheet)
+    student_dict = schema.to_record(student_sheet.row_values(row_number))
+    if cached_student and student_dict['student_identifier'] != cached_student.student_identifier:
+        row_number = backend.find_student_row(student_sheet, search_term)
+        if not row_number: return f"Student '{search_term}' not found. <a href='/'>Go back</a>."
+        student_dict = schema.to_record(student_sheet.row_values(row_number))
+    doc_responses = doc_future.result() if doc_future else []
     required_docs = ["10th Marksheet", "12th Marksheet", "IAT Admit Card", "Transfer Certificate", "Fee Receipt", "Caste Certificate"]
     return render_template('student_details.html', student=student_dict, doc_responses=doc_responses, required_docs=required_docs)
 
 # --- Feature Routes ---
+def lhc_queue_with_estimate():
+    """ Students in the LHC queue (oldest first) and their expected waits. """
+    frame = students.get().frame()
+    queue_list = frame.select(frame.status_is('lhc_docs', 'In Queue'), order_by='lhc_docs')
+    return queue_list, lhc_wait.estimate(len(queue_list))
+
 @app.route('/lhc_queue')
 @login_required
 def lhc_queue():
-    all_records = backend.get_all_records_safely(student_sheet, backend.STUDENT_HEADERS)
-    queue_list = [r for r in all_records if r.get('stage3_lhc_docs_status') == 'In Queue']
-    return render_template('lhc_queue.html', queue=queue_list, now=datetime.now())
+    queue_list, estimate = lhc_queue_with_estimate()
+    return render_template('lhc_queue.html', queue=queue_list, estimate=estimate, now=datetime.now())
+
+@app.route('/lhc_queue/estimate')
+@login_required
+def lhc_queue_estimate():
+    queue_list, estimate = lhc_queue_with_estimate()
+    queue = [{'position': i, 'student_identifier': student.student_identifier, 'student_name': student.student_name,
+              'queued_at': student.stage3_lhc_docs_ts, 'wait_minutes': wait}
+             for i, (student, wait) in enumerate(zip(queue_list, estimate.pop('per_position')), 1)]
+    return jsonify(queue=queue, **estimate)
 
 @app.route('/lhc_queue/mark_done', methods=['POST'])
 @login_required
@@ -256,36 +480,77 @@ def lhc_mark_done():
         flash(f"Student '{student_id}' not found.", "error")
         return redirect(url_for('lhc_queue'))
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cells_to_update = [
-        gspread.Cell(row_number, 12, 'Done'),
-        gspread.Cell(row_number, 13, volunteer_name),
-        gspread.Cell(row_number, 14, timestamp)
-    ]
-    student_sheet.update_cells(cells_to_update)
+    student_sheet.update_cells(backend.stage_cells(student_sheet, row_number, 'lhc_docs', 'Done', volunteer_name, timestamp))
+    students.mark_rows_dirty(row_number)
     flash(f"Student {student_id} marked as done for LHC.", "success")
     return redirect(url_for('lhc_queue'))
 
+@app.route('/students/bulk', methods=['POST'])
+@login_required
+def bulk_students():
+    action = request.form.get('action')
+    student_ids = request.form.getlist('student_ids')
+    next_page = 'lhc_queue' if request.form.get('next') == 'lhc_queue' else 'students_list'
+    if not student_ids:
+        flash("Select at least one student first.", "error")
+        return redirect(url_for(next_page))
+    volunteer_name = session['username'].capitalize()
+    results = backend.apply_bulk_action(student_sheet, students.get(), student_ids, action, volunteer_name)
+    done = [(student_id, row) for student_id, row, error in results if not error]
+    students.mark_rows_dirty(*[row for _, row in done])
+    if done:
+        label = backend.BULK_ACTIONS.get(action, action)
+        flash(f"{label}: {len(done)} student(s) updated ({example_ids([student_id for student_id, _ in done])}).", "success")
+    # One message per distinct reason: the flashes live in the session cookie, which
+    # overflows (and logs the volunteer out) if every rejected student gets its own line
+    rejected = {}
+    for student_id, _, error in results:
+        if error:
+            rejected.setdefault(error, []).append(student_id)
+    for error, ids in rejected.items():
+        flash(f"{len(ids)} student(s) not updated, {error} ({example_ids(ids)}).", "error")
+    return redirect(url_for(next_page))
+
+BULK_REPORT_IDS = 5 # Student IDs named per bulk result message; the rest are only counted
+
+def example_ids(ids):
+    """ Names the first BULK_REPORT_IDS IDs and counts the rest, e.g. 'A1, A2, A3, A4, A5 and 12 more'. """
+    shown = ', '.join(ids[:BULK_REPORT_IDS])
+    return f"{shown} and {len(ids) - BULK_REPORT_IDS} more" if len(ids) > BULK_REPORT_IDS else shown
+
 @app.route('/faq')
 @login_required
 def faq():
     if not faq_sheet: return "Error: FAQ Sheet not connected."
-    faqs = backend.get_all_faqs(faq_sheet)
-    return render_template('faq.html', faqs=faqs)
+    query = request.args.get('q', '').strip()
+    index = get_faq_index()
+    faqs = index.search(query) if query else index.all()
+    return render_template('faq.html', faqs=faqs, query=query)
+
+@app.route('/faq/search')
+@login_required
+def faq_search():
+    if not faq_sheet: return jsonify(error="FAQ Sheet not connected."), 503
+    query = request.args.get('q', '').strip()
+    return jsonify(results=get_faq_index().search(query, limit=request.args.get('limit', 10, type=int)))
 
 @app.route('/leaderboard')
 @login_required
 def leaderboard():
     if not student_sheet: return "Error: Student Sheet not connected."
-    board = backend.get_volunteer_leaderboard(student_sheet)
-    return render_template('leaderboard.html', leaderboard=board)
+    store = students.get()
+    leaderboard_html = render_fragment('_leaderboard_list.html', store.version,
+                                       lambda: dict(leaderboard=backend.volunteer_leaderboard(store)))
+    return render_template('leaderboard.html', leaderboard_html=leaderboard_html)
 
 @app.route('/flagged')
 @login_required
 def flagged_students():
     if not student_sheet: return "Error: Student Sheet not connected."
-    all_records = backend.get_all_records_safely(student_sheet, backend.STUDENT_HEADERS)
-    flagged_list = [r for r in all_records if r.get('flagged') == 'yes']
-    return render_template('flagged_students.html', students=flagged_list)
+    store = students.get()
+    flagged_html = render_fragment('_flagged_list.html', store.version,
+                                   lambda: dict(students=store.frame().select(store.frame().flagged)))
+    return render_template('flagged_students.html', flagged_html=flagged_html)
 
 # --- NEW: Route to handle updating the verified document checklist ---
 @app.route('/update_documents', methods=['POST'])
@@ -302,37 +567,10 @@ def update_documents():
         'Fee Receipt': 'yes' if 'Fee Receipt' in request.form else 'no'
     }
     
-    backend.update_verified_documents(student_sheet, student_id, verified_docs)
+    students.mark_rows_dirty(backend.update_verified_documents(student_sheet, student_id, verified_docs))
     flash("Verified document checklist has been saved.", "success")
     return redirect(url_for('search_student_get', search_term=student_id))
 
-# --- Document Checklist Functions ---
-def get_document_responses(sheet, app_id):
-    """ Fetches a student's self-reported document checklist from the form responses. """
-    try:
-        all_responses = get_all_records_safely(sheet, DOC_RESPONSE_HEADERS)
-        for response in all_responses:
-            if str(response.get('Application No')) == str(app_id):
-                return response.get('Documents Available', '').split(', ')
-        return []
-    except Exception:
-        return []
-
-def update_verified_documents(sheet, student_id, verified_docs):
-    """ Updates the verified document status in the main Students sheet. """
-    row_num = find_student_row(sheet, student_id)
-    if not row_num: return False
-    
-    doc_map = {
-        '10th Marksheet': 20, '12th Marksheet': 21, 'Caste Certificate': 22,
-        'IAT Admit Card': 23, 'Transfer Certificate': 24, 'Fee Receipt': 25
-    }
-    
-    for doc_name, status in verified_docs.items():
-        if doc_name in doc_map:
-            sheet.update_cell(row_num, doc_map[doc_name], status)
-    return True
-
 # --- ADMIN PANEL ROUTES ---
 @app.route('/admin')
 @admin_required
@@ -346,14 +584,20 @@ def admin_panel():
 def admin_faq():
     if not faq_sheet: return "Error: FAQ Sheet not connected."
     faqs = backend.get_all_faqs(faq_sheet)
-    faqs_with_rows = [dict(faq, row_id=i+2) for i, faq in enumerate(faqs)]
-    return render_template('admin_faq.html', faqs=faqs_with_rows)
+    return render_template('admin_faq.html', faqs=faqs)
 
 @app.route('/admin/faq/add', methods=['POST'])
 @admin_required
 def add_faq():
+    global faq_index
     question, answer = request.form['question'], request.form['answer']
-    backend.add_faq(faq_sheet, question, answer)
+    row_id = backend.add_faq(faq_sheet, question, answer)
+    with faq_index_lock:
+        drop_stale_faq_index()
+        if row_id and faq_index and question.strip().lower() not in backend.DEFAULT_FAQ_QUESTIONS:
+            faq_index.add({'question': question, 'answer': answer, 'row_id': row_id})
+        else:
+            faq_index = None # Rebuilt on next use (e.g. the new FAQ replaces a default one)
     session['new_faq_added'] = True # Set the notification flag
     flash("New FAQ added successfully.", "success")
     return redirect(url_for('admin_faq'))
@@ -361,7 +605,13 @@ def add_faq():
 @app.route('/admin/faq/delete/<row_id>')
 @admin_required
 def delete_faq(row_id):
-    backend.delete_faq(faq_sheet, row_id)
+    if not backend.delete_faq(faq_sheet, row_id, request.args.get('question', '')):
+        flash("That FAQ has moved or was already deleted. Please try again from the refreshed list.", "error")
+        return redirect(url_for('admin_faq'))
+    with faq_index_lock:
+        drop_stale_faq_index()
+        if faq_index:
+            faq_index.remove(int(row_id))
     flash("FAQ deleted successfully.", "success")
     return redirect(url_for('admin_faq'))
 
@@ -1,14 +1,27 @@
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 import os
+import re
+import sys
 import csv
-from collections import Counter
+import json
+import argparse
+import contextlib
+import hashlib
+import math
+import threading
+import tracemalloc
+import numpy as np
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # --- Configuration ---
 JSON_KEYFILE = 'creds.json' 
 SPREADSHEET_NAME = 'CampusArrival2025' 
+STUCK_THRESHOLD_MINUTES = 60 # A student with no update for this long counts as stuck
 
 # --- Headers Configuration ---
 STUDENT_HEADERS = [
@@ -27,13 +40,40 @@ ANNOUNCEMENT_HEADERS = ['message']
 # ADD this new header list
 DOC_RESPONSE_HEADERS = ['Timestamp', 'Application No', 'Documents Available']
 
+# --- Soft-Delete Configuration ---
+# Deleted rows keep their position and only get this marker in column A, so row
+# numbers (FAQ row_id links, in-memory row indexes) stay valid until compaction.
+TOMBSTONE = '__deleted__'
+
+# --- Column Name Maps (positions come from the sheet's header row, see SheetSchema) ---
+# Stage key -> column prefix; each stage has '<prefix>_status', '_by' and '_ts' columns
+STAGES = {
+    'entry': 'stage0_entry', 'hostel': 'stage1_hostel', 'insurance': 'stage2_insurance',
+    'lhc_docs': 'stage3_lhc_docs', 'doaa': 'stage4_doaa'
+}
+# Document name (as used in forms) -> verified column
+DOC_COLUMNS = {
+    '10th Marksheet': 'verified_10th_marksheet', '12th Marksheet': 'verified_12th_marksheet',
+    'Caste Certificate': 'verified_caste_certificate', 'IAT Admit Card': 'verified_iat_admit_card',
+    'Transfer Certificate': 'verified_transfer_certificate', 'Fee Receipt': 'verified_fee_receipt'
+}
+# Values a freshly added student starts with; every other column is blank
+STUDENT_DEFAULTS = dict(
+    {f'{prefix}_status': 'Pending' for prefix in STAGES.values()},
+    flagged='no', **{col: 'no' for col in DOC_COLUMNS.values()}
+)
+
 # --- Connection Functions ---
+def authorize_client():
+    """ Creates a new authorized gspread client from the service account key. """
+    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+    creds = ServiceAccountCredentials.from_json_keyfile_name(JSON_KEYFILE, scope)
+    return gspread.authorize(creds)
+
 def connect_to_spreadsheet(spreadsheet_name):
     """ Connects to a Google Spreadsheet file and returns the spreadsheet object. """
     try:
-        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        creds = ServiceAccountCredentials.from_json_keyfile_name(JSON_KEYFILE, scope)
-        client = gspread.authorize(creds)
+        client = authorize_client()
         spreadsheet = client.open(spreadsheet_name)
         print(f"✅ Successfully connected to Google Sheet: {spreadsheet_name}")
         return spreadsheet
@@ -41,13 +81,62 @@ def connect_to_spreadsheet(spreadsheet_name):
         print(f"❌ An error occurred connecting to {spreadsheet_name}: {e}")
         return None
 
+# --- Concurrent Reads ---
+# gspread clients share one HTTP session and are not thread-safe, so every pool
+# thread opens its own client and keeps its own handle on each worksheet.
+READ_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='sheets-read')
+_thread_state = threading.local()
+
+def thread_worksheet(sheet):
+    """ Returns the calling thread's private handle on the same worksheet. """
+    handles = _thread_state.__dict__.setdefault('worksheets', {})
+    key = _sheet_key(sheet)
+    if key not in handles:
+        if not hasattr(_thread_state, 'client'):
+            _thread_state.client = authorize_client()
+        handles[key] = _thread_state.client.open_by_key(sheet.spreadsheet.id).get_worksheet_by_id(sheet.id)
+    return handles[key]
+
+def _read_on_thread(fn, sheet, args, default):
+    try:
+        worksheet = thread_worksheet(sheet)
+    except Exception as e:
+        print(f"❌ Could not open '{sheet.title}' on a read thread: {e}")
+        return default
+    return fn(worksheet, *args)
+
+class ParallelReads:
+    """ Request-scoped batch of independent sheet reads, run concurrently on READ_POOL.
+    submit() returns a Future; join() (or leaving the with-block) waits for all of them. """
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, sheet, *args, default=None):
+        """ Schedules fn(sheet, *args); `default` is returned if the sheet cannot be opened. """
+        future = READ_POOL.submit(_read_on_thread, fn, sheet, args, default)
+        self.futures.append(future)
+        return future
+
+    def join(self):
+        wait(self.futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.join()
+
 # --- Header Verification Tool ---
 def verify_headers(sheet, headers):
-    """ Checks if the headers in a given sheet match the expected headers. """
+    """ Checks if the headers in a given sheet match the expected headers and compiles its schema. """
     try:
         actual_headers = sheet.row_values(1)
         if set(headers) == set(actual_headers):
+            _SCHEMAS[_sheet_key(sheet)] = SheetSchema(sheet.title, actual_headers)
             print(f"✅ Headers for '{sheet.title}' verified successfully.")
+            if list(headers) != actual_headers[:len(headers)]:
+                print(f"   Note: columns in '{sheet.title}' are reordered; using their actual positions.")
             return True
         else:
             print(f"❌ CRITICAL ERROR: Headers in '{sheet.title}' do not match.")
@@ -64,52 +153,221 @@ def verify_headers(sheet, headers):
         print(f"❌ Could not verify headers for '{sheet.title}'. The sheet might be empty.")
         return False
 
+# --- Column Schema ---
+class SheetSchema:
+    """ Column layout of a worksheet, compiled from its real header row. """
+
+    def __init__(self, title, header_row):
+        self.title = title
+        self.names = list(header_row)
+        self.checked_at = time.time()
+        self.width = len(self.names)
+        self._cols = {name: i for i, name in enumerate(self.names, start=1) if name}
+
+    def __contains__(self, name):
+        return name in self._cols
+
+    def col(self, name):
+        """ 1-based column number of a header name. """
+        try:
+            return self._cols[name]
+        except KeyError:
+            raise KeyError(f"Column '{name}' not found in sheet '{self.title}'") from None
+
+    def letter(self, name):
+        """ Column letter(s) of a header name, e.g. 'flagged' -> 'S'. """
+        return column_letter(self.col(name))
+
+    def to_record(self, row_values):
+        """ Turns a raw row (as returned by row_values) into a {header: value} dict. """
+        padded = list(row_values) + [''] * (self.width - len(row_values))
+        return {name: padded[i] for i, name in enumerate(self.names) if name}
+
+    def new_row(self, values):
+        """ Builds a full row in sheet order from a {header: value} dict. """
+        return [values.get(name, '') for name in self.names]
+
+def column_letter(col_num):
+    """ Converts a 1-based column number to A1 notation letters (1 -> 'A', 27 -> 'AA'). """
+    letters = ''
+    while col_num:
+        col_num, rem = divmod(col_num - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+_SCHEMAS = {}
+SCHEMA_CHECK_SECONDS = 60 # A cached header row is re-read this often, to notice columns moved in the Sheets UI
+
+def _sheet_key(sheet):
+    return (sheet.spreadsheet.id, sheet.id)
+
+def get_schema(sheet):
+    """ Returns the cached schema for a worksheet, re-reading its header row when it is due. """
+    schema = _SCHEMAS.get(_sheet_key(sheet))
+    if schema is None or time.time() - schema.checked_at > SCHEMA_CHECK_SECONDS:
+        schema = refresh_schema(sheet)
+    return schema
+
+def refresh_schema(sheet):
+    """ Re-reads the header row and recompiles the schema if the columns moved.
+    If the read fails, the cached schema is kept and re-checked on the next call. """
+    key = _sheet_key(sheet)
+    cached = _SCHEMAS.get(key)
+    try:
+        header_row = sheet.row_values(1)
+    except Exception:
+        if cached is None:
+            raise
+        return cached
+    if cached is not None and cached.names == header_row:
+        cached.checked_at = time.time()
+        return cached
+    if cached is not None:
+        print(f"⚠️ Columns in '{sheet.title}' changed; using their new positions.")
+    _SCHEMAS[key] = SheetSchema(sheet.title, header_row)
+    return _SCHEMAS[key]
+
+def get_projected_records(sheet, columns):
+    """ Fetches only the given columns for every data row in a single batch_get.
+    Records carry their 'row_id'; blank and deleted rows are skipped. """
+    schema = get_schema(sheet)
+    # Column A always comes along: it holds the tombstone marker
+    wanted = [schema.names[0]] + [c for c in columns if c != schema.names[0]]
+    ranges = [f"{schema.letter(c)}2:{schema.letter(c)}" for c in wanted]
+    try:
+        value_ranges = sheet.batch_get(ranges, major_dimension='COLUMNS')
+    except Exception:
+        return []
+    # Each range comes back as [[v2, v3, ...]] with trailing blanks trimmed
+    column_values = [vr[0] if vr else [] for vr in value_ranges]
+    row_total = max((len(values) for values in column_values), default=0)
+
+    records = []
+    for i in range(row_total):
+        record = {c: (values[i] if i < len(values) else '') for c, values in zip(wanted, column_values)}
+        if record[wanted[0]] == TOMBSTONE or not any(record.values()):
+            continue
+        record['row_id'] = i + 2
+        records.append(record)
+    return records
+
+def new_student_row(sheet, app_id, student_name):
+    """ Builds a complete row for a new student in the sheet's actual column order. """
+    return get_schema(sheet).new_row(dict(STUDENT_DEFAULTS, student_identifier=app_id, student_name=student_name))
+
 # --- Core Functions ---
 def find_student_row(sheet, search_term):
     """ Finds a student by their Application ID or Name and returns the row number. """
+    if search_term == TOMBSTONE: return None
     try:
         cell = sheet.find(search_term)
         return cell.row if cell else None
     except Exception:
         return None
 
+def student_still_at(sheet, row_number, student_id):
+    """ Re-reads a row's ID cell just before writing to it. The row may have moved since it
+    was looked up, e.g. when the web app's compactor ran while the CLI waited for input. """
+    if sheet.cell(row_number, get_schema(sheet).col('student_identifier')).value == student_id:
+        return True
+    print("❌ Error: The sheet changed while waiting for your input (rows may have moved). Nothing was written; please try again.")
+    return False
+
+# --- Soft-Delete & Compaction Functions ---
+def is_tombstone(record):
+    """ Returns True if a fetched record is a deleted row (marker in its first column). """
+    return str(next(iter(record.values()), '')) == TOMBSTONE
+
+def tombstone_row(sheet, row_num):
+    """ Marks a row as deleted in place: column A gets the marker, the rest is blanked. """
+    cells = [gspread.Cell(row_num, 1, TOMBSTONE)]
+    cells += [gspread.Cell(row_num, col, '') for col in range(2, get_schema(sheet).width + 1)]
+    sheet.update_cells(cells)
+
+def compact_tombstones(sheet):
+    """ Physically removes all tombstoned rows in one batch request.
+    Returns the sorted list of removed row numbers (pre-compaction), or [] if none. """
+    first_column = sheet.col_values(1)
+    removed = [i for i, value in enumerate(first_column, start=1) if i > 1 and value == TOMBSTONE]
+    if not removed:
+        return []
+
+    # Group into contiguous runs and delete bottom-up so earlier indexes stay valid
+    runs = []
+    for row in removed:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    requests = [{
+        'deleteDimension': {
+            'range': {'sheetId': sheet.id, 'dimension': 'ROWS', 'startIndex': start - 1, 'endIndex': end}
+        }
+    } for start, end in reversed(runs)]
+    sheet.spreadsheet.batch_update({'requests': requests})
+    print(f"✅ Compacted '{sheet.title}': removed {len(removed)} deleted row(s).")
+    return removed
+
+def remap_row(row_num, removed_rows):
+    """ Maps a pre-compaction row number to its new position, or None if it was removed. """
+    shift = bisect_left(removed_rows, row_num)
+    if shift < len(removed_rows) and removed_rows[shift] == row_num:
+        return None
+    return row_num - shift
+
 # --- Functions for Web App ---
 def get_all_records_safely(sheet, headers):
-    """ A robust function to fetch all records for the web app. """
+    """ A robust function to fetch all records for the web app. Deleted rows are skipped. """
+    return [r for r in get_all_records_with_rows(sheet, headers) if not is_tombstone(r)]
+
+def get_all_records_with_rows(sheet, headers):
+    """ Fetches all records (tombstones included) with their sheet row number as 'row_id'. """
     try:
         if sheet.row_count > 1:
-            return sheet.get_all_records(expected_headers=headers)
+            records = sheet.get_all_records(expected_headers=headers)
+            return [dict(record, row_id=i) for i, record in enumerate(records, start=2)]
         else:
             return []
     except Exception:
         return []
 
 def add_student_from_webapp(sheet, app_id, student_name):
-    """ Adds a new student record to the sheet. Called by the web app. """
-    if find_student_row(sheet, app_id):
-        return
-    new_row_data = [
-        app_id, student_name,
-        'Pending', '', '', 'Pending', '', '', 'Pending', '', '', 'Pending', '', '', 'Pending', '', '', '', 'no','no', 'no', 'no', 'no', 'no','no'
-    ]
-    sheet.append_row(new_row_data)
+    """ Adds a new student record to the sheet and returns its row. Called by the web app. """
+    existing_row = find_student_row(sheet, app_id)
+    if existing_row:
+        return existing_row
+    response = sheet.append_row(new_student_row(sheet, app_id, student_name))
     print(f"✅ New student '{student_name}' ({app_id}) added via web app.")
+    return appended_row(response)
+
+def appended_row(response):
+    """ Row number written by append_row, from e.g. {'updates': {'updatedRange': "Students!A12:Y12"}}. """
+    match = re.search(r'![A-Z]+(\d+)', (response or {}).get('updates', {}).get('updatedRange', ''))
+    return int(match.group(1)) if match else None
 
 # ADD this new function to backend_logic.py
 def update_student_flag(sheet, student_id, flag_status):
-    """ Updates the 'flagged' status for a student. """
+    """ Updates the 'flagged' status for a student. Returns the row written, or False. """
     row_num = find_student_row(sheet, student_id)
     if not row_num: return False
-    # Column S is the 19th column
-    sheet.update_cell(row_num, 19, flag_status)
-    return True
+    sheet.update_cell(row_num, get_schema(sheet).col('flagged'), flag_status)
+    return row_num
+
+def stage_cells(sheet, row_num, stage_key, status, updated_by, timestamp):
+    """ Builds the status/by/ts cells of one stage (e.g. 'lhc_docs') for update_cells. """
+    schema, prefix = get_schema(sheet), STAGES[stage_key]
+    return [
+        gspread.Cell(row_num, schema.col(f'{prefix}_status'), status),
+        gspread.Cell(row_num, schema.col(f'{prefix}_by'), updated_by),
+        gspread.Cell(row_num, schema.col(f'{prefix}_ts'), timestamp)
+    ]
 
 # ADD these new functions to backend_logic.py
 
 def get_document_responses(sheet, app_id):
     """ Fetches a student's self-reported document checklist from the form responses. """
     try:
-        all_responses = get_all_records_safely(sheet, DOC_RESPONSE_HEADERS)
+        all_responses = get_projected_records(sheet, ['Application No', 'Documents Available'])
         for response in all_responses:
             if str(response.get('Application No')) == str(app_id):
                 # The responses are in a single comma-separated string
@@ -119,20 +377,770 @@ def get_document_responses(sheet, app_id):
         return []
 
 def update_verified_documents(sheet, student_id, verified_docs):
-    """ Updates the verified document status in the main Students sheet. """
+    """ Updates the verified document status in the main Students sheet. Returns the row written, or False. """
     row_num = find_student_row(sheet, student_id)
     if not row_num: return False
 
-    # Dynamically update based on the docs provided
-    doc_map = {
-        '10th Marksheet': 20, '12th Marksheet': 21, 'Caste Certificate': 22,
-        'IAT Admit Card': 23, 'Transfer Certificate': 24, 'Fee Receipt': 25
-    }
+    # Dynamically update based on the docs provided, in a single request
+    schema = get_schema(sheet)
+    cells = [gspread.Cell(row_num, schema.col(DOC_COLUMNS[doc_name]), status)
+             for doc_name, status in verified_docs.items() if doc_name in DOC_COLUMNS]
+    if cells:
+        sheet.update_cells(cells)
+    return row_num
 
-    for doc_name, status in verified_docs.items():
-        if doc_name in doc_map:
-            sheet.update_cell(row_num, doc_map[doc_name], status)
-    return True
+# --- Compact Student Store ---
+# A list of 25-key dicts costs ~1.9 KB per student; the slotted records below keep
+# the same data in ~0.6 KB (see measure_store_memory). Low-cardinality columns
+# (statuses, yes/no flags, volunteer names) are interned so every record shares
+# one copy of each string.
+STATUS_VALUES = ('Pending', 'In Queue', 'Done')
+STATUS_CODES = {status: code for code, status in enumerate(STATUS_VALUES)}
+INTERNED_COLUMNS = frozenset(
+    [f'{prefix}_{field}' for prefix in STAGES.values() for field in ('status', 'by')]
+    + ['flagged'] + list(DOC_COLUMNS.values())
+)
+
+class StudentRecord:
+    """ One student row. Reads like a dict (student['flagged'], student.get(...))
+    and like an object (student.student_name), so templates work unchanged. """
+    __slots__ = tuple(STUDENT_HEADERS) + ('row_id',)
+
+    def __init__(self, values, row_id):
+        for name, value in zip(STUDENT_HEADERS, values):
+            setattr(self, name, sys.intern(value) if name in INTERNED_COLUMNS else value)
+        self.row_id = row_id
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except (AttributeError, TypeError):
+            raise KeyError(name) from None
+
+    def __contains__(self, name):
+        return name in self.__slots__
+
+    def get(self, name, default=None):
+        return getattr(self, name, default) if isinstance(name, str) else default
+
+    def keys(self):
+        return self.__slots__
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def same_values(self, other):
+        """ True if both records hold the same cell values, wherever their rows are. """
+        return all(getattr(self, name) == getattr(other, name) for name in STUDENT_HEADERS)
+
+    def stage_code(self, stage_key):
+        """ Small-integer status of a stage: 0 Pending, 1 In Queue, 2 Done, -1 unknown. """
+        return STATUS_CODES.get(getattr(self, f'{STAGES[stage_key]}_status'), -1)
+
+class StudentStore:
+    """ Compact in-memory copy of the Students sheet, built from a single fetch.
+    `version` is a digest of the content: two loads of unchanged data share it. """
+
+    def __init__(self, records=(), version='', by_id=None):
+        self.records = list(records)
+        self.version = version
+        self.by_id = by_id if by_id is not None else {record.student_identifier: record for record in self.records}
+        self._frame = None
+        self._row_ids = None # Sorted array of the records' row_ids, for merge()
+
+    def frame(self):
+        """ Vectorized query view of this store, built once on first use. """
+        if self._frame is None:
+            self._frame = StudentFrame(self.records)
+        return self._frame
+
+    @classmethod
+    def from_rows(cls, schema, rows, first_row=2):
+        """ Builds a store from raw sheet rows (header excluded) in the schema's column order. """
+        positions = [schema.col(name) - 1 for name in STUDENT_HEADERS]
+        records = []
+        digest = hashlib.blake2b(digest_size=12)
+        for row_id, row in enumerate(rows, start=first_row):
+            values = [str(row[i]) if i < len(row) else '' for i in positions]
+            if values[0] == TOMBSTONE or not any(values):
+                continue
+            records.append(StudentRecord(values, row_id))
+            digest.update(('\x1f'.join(values) + f'\x1e{row_id}\x1e').encode())
+        return cls(records, digest.hexdigest())
+
+    @classmethod
+    def from_sheet(cls, sheet):
+        """ One full fetch of the sheet. Errors propagate, so a failed read never looks like an empty sheet. """
+        return cls.from_rows(get_schema(sheet), sheet.get_all_values()[1:])
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def find(self, student_id):
+        return self.by_id.get(str(student_id))
+
+    def merge(self, fetched_ranges):
+        """ Returns a new store with the given (first_row, last_row, records) ranges replaced,
+        plus the list of change events. Old and new records are paired by student ID, so a
+        student whose row only moved (e.g. after another worker compacted) is relocated
+        without an event. Unchanged data returns this same store. The new store shares
+        everything else with this one, including the frame, in which only the merged rows
+        are recomputed. """
+        if self._row_ids is None:
+            self._row_ids = np.fromiter((record.row_id for record in self.records), dtype=np.int64, count=len(self.records))
+        row_ids = self._row_ids
+        replaced = set() # Indexes of the records the fetch supersedes
+        previous = {} # student ID -> indexes of old records of that ID, in row order
+        fresh = []
+        for first, last, records in fetched_ranges:
+            for i in range(int(np.searchsorted(row_ids, first)), int(np.searchsorted(row_ids, last, side='right'))):
+                if i not in replaced:
+                    replaced.add(i)
+                    previous.setdefault(self.records[i].student_identifier, []).append(i)
+            fresh += records
+        # Students fetched at a new row may have been held at a row outside the fetched ranges
+        missing = Counter(record.student_identifier for record in fresh)
+        missing.subtract({student_id: len(olds) for student_id, olds in previous.items()})
+        for student_id, count in missing.items():
+            old = self.by_id.get(student_id)
+            if count <= 0 or old is None:
+                continue
+            i = int(np.searchsorted(row_ids, old.row_id))
+            if i < len(self.records) and self.records[i] is old and i not in replaced:
+                replaced.add(i)
+                previous.setdefault(student_id, []).append(i)
+
+        events, moved = [], []
+        for new in fresh:
+            olds = previous.get(new.student_identifier)
+            old = self.records[olds.pop(0)] if olds else None
+            if old is None:
+                events.append(('added', None, new))
+            elif not old.same_values(new):
+                events.append(('changed', old, new))
+            elif old.row_id != new.row_id:
+                moved.append((old.row_id, new.row_id))
+        events += [('removed', self.records[i], None) for olds in previous.values() for i in olds]
+        if not events and not moved:
+            return self, events
+        digest = hashlib.blake2b(self.version.encode(), digest_size=12)
+        for kind, old, new in events:
+            digest.update(repr((kind, (new or old).items())).encode())
+        digest.update(repr(moved).encode())
+
+        # Splice: drop the replaced records, then insert the fetched ones by row
+        positions = sorted(replaced)
+        fresh.sort(key=lambda record: record.row_id)
+        fresh_ids = np.fromiter((record.row_id for record in fresh), dtype=np.int64, count=len(fresh))
+        kept_ids = np.delete(row_ids, positions)
+        slots = np.searchsorted(kept_ids, fresh_ids) + np.arange(len(fresh)) # Final index of each fetched record
+        records = list(self.records)
+        for i in reversed(positions):
+            del records[i]
+        for slot, record in zip(slots.tolist(), fresh):
+            records.insert(slot, record)
+        # Updated in place rather than copied (a copy costs more than the rest of the merge);
+        # requests still holding this store then simply see the newer records in find()
+        by_id = self.by_id
+        for i in positions:
+            old = self.records[i]
+            if by_id.get(old.student_identifier) is old:
+                del by_id[old.student_identifier]
+        by_id.update((record.student_identifier, record) for record in fresh)
+
+        store = StudentStore(records, digest.hexdigest(), by_id)
+        store._row_ids = np.insert(kept_ids, slots - np.arange(len(fresh)), fresh_ids)
+        if self._frame is not None:
+            # Index of each record in this store's frame, or -1 for the fetched ones
+            sources = np.insert(np.delete(np.arange(len(self.records)), positions), slots - np.arange(len(fresh)), -1)
+            store._frame = self._frame.derive(records, sources)
+        return store, events
+
+    def apply_compaction(self, removed_rows):
+        """ Shifts row_ids after compact_tombstones() instead of re-downloading the sheet. """
+        for record in self.records:
+            record.row_id = remap_row(record.row_id, removed_rows) or record.row_id
+        self._row_ids = None
+
+class StudentCache:
+    """ Per-process StudentStore. A StudentSync keeps it current by merging changed rows;
+    without one it is fully re-fetched after `ttl` seconds. Subscribers get the change
+    events of every merge: ('added' | 'changed' | 'removed', old_record, new_record),
+    or a single ('reloaded', None, None) after a full fetch. """
+
+    def __init__(self, sheet, ttl=20):
+        self.sheet, self.ttl = sheet, ttl
+        self._store, self._loaded_at = None, 0
+        self._dirty_rows = set()
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def _emit(self, events):
+        for callback in self._subscribers:
+            try:
+                callback(events)
+            except Exception as e:
+                print(f"❌ Student change subscriber failed: {e}")
+
+    def get(self):
+        with self._lock:
+            if self._store is None or time.time() - self._loaded_at > self.ttl:
+                self.reload()
+            elif self._dirty_rows:
+                rows, self._dirty_rows = sorted(self._dirty_rows), set()
+                self.merge_ranges(fetch_student_ranges(self.sheet, [(row, row) for row in rows]))
+            return self._store
+
+    def reload(self, sheet=None):
+        """ Full fetch (through `sheet`, e.g. a background thread's own handle, if given).
+        Returns False if it failed: the previous store is kept and the next get() retries. """
+        try:
+            store = StudentStore.from_sheet(sheet or self.sheet)
+        except Exception as e:
+            print(f"❌ Could not load the student sheet: {e}")
+            with self._lock:
+                if self._store is None:
+                    self._store = StudentStore() # Empty but stale, so the next get() retries
+            return False
+        with self._lock:
+            self._store = store
+            self._loaded_at = time.time()
+            self._dirty_rows = set()
+        self._emit([('reloaded', None, None)])
+        return True
+
+    def peek(self):
+        """ The currently loaded store if it is still fresh, without triggering a fetch. """
+        with self._lock:
+            if self._store is not None and time.time() - self._loaded_at <= self.ttl:
+                return self._store
+            return None
+
+    def invalidate(self):
+        with self._lock:
+            self._store = None
+
+    def mark_rows_dirty(self, *rows):
+        """ Records rows written by this app; only they are re-fetched on the next get(). """
+        with self._lock:
+            if self._store is None:
+                return
+            if None in rows:
+                self._store = None # Row unknown (e.g. append didn't report it)
+            else:
+                self._dirty_rows.update(row for row in rows if row)
+
+    def touch(self):
+        """ Marks the store as current, e.g. after a sync found nothing changed. """
+        with self._lock:
+            self._loaded_at = time.time()
+
+    def merge_ranges(self, fetched_ranges):
+        """ Merges freshly fetched (first_row, last_row, records) ranges into the store. """
+        with self._lock:
+            if self._store is None:
+                return []
+            self._store, events = self._store.merge(fetched_ranges)
+            self._loaded_at = time.time()
+        if events:
+            self._emit(events)
+        return events
+
+    def apply_compaction(self, removed_rows):
+        with self._lock:
+            if self._store is not None:
+                self._store.apply_compaction(removed_rows)
+
+def fetch_student_ranges(sheet, row_ranges):
+    """ Fetches whole student rows for each (first_row, last_row) in a single batch_get. """
+    if not row_ranges:
+        return []
+    schema = get_schema(sheet)
+    last_column = column_letter(schema.width)
+    value_ranges = sheet.batch_get([f"A{first}:{last_column}{last}" for first, last in row_ranges])
+    return [(first, last, StudentStore.from_rows(schema, list(values), first_row=first).records)
+            for (first, last), values in zip(row_ranges, value_ranges)]
+
+# --- Out-of-Band Change Detection ---
+SYNC_SHEET_TITLE = '_sync'  # Hidden helper sheet holding the checksum formulas
+SYNC_BLOCK_ROWS = 100  # Keeps each block's joined text under TEXTJOIN's 50,000-character limit
+
+class StudentSync:
+    """ Notices edits made directly in the Google Sheets UI without re-downloading the sheet.
+    Each check first asks Drive for the spreadsheet's modifiedTime and stops there if it
+    hasn't moved. Otherwise it reads the hidden '_sync' sheet, which holds the student row
+    count in A1 and, per block of SYNC_BLOCK_ROWS student rows, a formula checksumming
+    every character of the block weighted by its position. Only blocks whose checksum
+    moved are re-fetched and merged into the StudentCache. A full fetch every
+    `full_every` seconds is the backstop. """
+
+    def __init__(self, cache, interval=10, full_every=1800):
+        self.cache, self.interval, self.full_every = cache, interval, full_every
+        self._full_at = 0
+        self.sheet = cache.sheet
+        self._checksums = None
+        self._modified = None
+        self._helper = None
+        self._blocks_with_formulas = 0
+
+    def _helper_sheet(self):
+        if self._helper is None:
+            spreadsheet = self.sheet.spreadsheet
+            try:
+                self._helper = spreadsheet.worksheet(SYNC_SHEET_TITLE)
+            except gspread.WorksheetNotFound:
+                self._helper = spreadsheet.add_worksheet(SYNC_SHEET_TITLE, rows=1000, cols=1)
+                spreadsheet.batch_update({'requests': [{'updateSheetProperties': {
+                    'properties': {'sheetId': self._helper.id, 'hidden': True}, 'fields': 'hidden'}}]})
+            self._helper.update(values=[[f"=COUNTA('{self.sheet.title}'!A:A)"]], range_name='A1',
+                                value_input_option='USER_ENTERED')
+        return self._helper
+
+    def _ensure_formulas(self, blocks):
+        """ Writes checksum formulas for any blocks that don't have one yet. """
+        if blocks <= self._blocks_with_formulas:
+            return
+        helper = self._helper_sheet()
+        if helper.row_count < blocks + 1:
+            helper.add_rows(blocks + 1 - helper.row_count)
+        last_column = column_letter(get_schema(self.sheet).width)
+        formulas = []
+        for block in range(blocks):
+            first = 2 + block * SYNC_BLOCK_ROWS
+            # A text reference, which Sheets leaves alone when rows are inserted or deleted, so
+            # each block keeps covering the same fixed rows that sync_once() re-fetches by
+            cells = f"INDIRECT(\"'{self.sheet.title}'!A{first}:{last_column}{first + SYNC_BLOCK_ROWS - 1}\")"
+            # Every character code times its position in the joined block; if the text is
+            # too long for TEXTJOIN, fall back to cell lengths plus last characters
+            joined = f"TEXTJOIN(CHAR(31),FALSE,{cells})"
+            formulas.append([f"=IFERROR(LET(t,{joined},n,LEN(t),IF(n=0,0,SUMPRODUCT(UNICODE(MID(t,SEQUENCE(n),1)),SEQUENCE(n)))),"
+                             f"SUMPRODUCT(LEN({cells})*(ROW({cells})*31+COLUMN({cells})))"
+                             f"+SUMPRODUCT(IFERROR(CODE(RIGHT({cells})),0)*COLUMN({cells})))"])
+        helper.update(values=formulas, range_name=f'A2:A{blocks + 1}', value_input_option='USER_ENTERED')
+        self._blocks_with_formulas = blocks
+
+    def read_checksums(self):
+        """ Returns the per-block checksums, covering every current student row. """
+        values = self._helper_sheet().col_values(1)
+        row_total = int(values[0] or 0) if values else 0
+        blocks = max(1, -(-max(row_total - 1, 0) // SYNC_BLOCK_ROWS)) + 1 # One spare block for appends
+        if blocks > self._blocks_with_formulas:
+            self._ensure_formulas(blocks)
+            values = self._helper_sheet().col_values(1)
+        return values[1:blocks + 1]
+
+    def modified_time(self):
+        """ Drive's modifiedTime of the spreadsheet (a metadata call, not a Sheets read), or None. """
+        try:
+            return self.sheet.spreadsheet.get_lastUpdateTime()
+        except Exception:
+            return None
+
+    def sync_once(self):
+        """ Runs one check; returns the change events merged into the cache. """
+        full_due = self._checksums is None or self.cache.peek() is None or time.time() - self._full_at > self.full_every
+        # Read before the checksums: an edit landing in between moves it again for the next check
+        modified = self.modified_time()
+        if not full_due and modified is not None and modified == self._modified:
+            self.cache.touch()
+            return []
+        checksums = self.read_checksums()
+        if full_due:
+            # Checksums are read before the full fetch, so nothing can slip in between.
+            # They are only kept if the fetch worked; otherwise the next check retries it.
+            if self.cache.reload(self.sheet):
+                self._checksums, self._full_at, self._modified = checksums, time.time(), modified
+            return []
+        old = self._checksums
+        changed = [block for block in range(max(len(old), len(checksums)))
+                   if block >= len(old) or block >= len(checksums) or old[block] != checksums[block]]
+        if not changed:
+            self._checksums, self._modified = checksums, modified
+            self.cache.touch()
+            return []
+        ranges = [(2 + block * SYNC_BLOCK_ROWS, 1 + (block + 1) * SYNC_BLOCK_ROWS) for block in changed]
+        events = self.cache.merge_ranges(fetch_student_ranges(self.sheet, ranges))
+        self._checksums, self._modified = checksums, modified
+        if events:
+            print(f"🔄 Synced {len(events)} changed student row(s) from '{self.sheet.title}'.")
+        return events
+
+    def run(self):
+        while True:
+            try:
+                if self.sheet is self.cache.sheet:
+                    # The shared client isn't thread-safe: this thread polls through its own
+                    self.sheet, self._helper = thread_worksheet(self.cache.sheet), None
+                self.sync_once()
+            except Exception as e:
+                print(f"❌ Student sheet sync failed: {e}")
+            time.sleep(self.interval)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+def measure_store_memory(count=10000):
+    """ Prints the memory used by `count` synthetic students as dicts vs. as a StudentStore. """
+    schema = SheetSchema('Students', STUDENT_HEADERS)
+    volunteers = [f'volunteer{i}' for i in range(40)]
+    rows = []
+    for i in range(count):
+        row = schema.new_row(dict(STUDENT_DEFAULTS, student_identifier=f'IAT{100000 + i}', student_name=f'Student Name {i}'))
+        for j, prefix in enumerate(STAGES.values()):
+            if i % 5 > j:
+                row[schema.col(f'{prefix}_status') - 1] = 'Done'
+                row[schema.col(f'{prefix}_by') - 1] = volunteers[(i + j) % 40]
+                row[schema.col(f'{prefix}_ts') - 1] = f'2025-07-2{j} 1{j}:{i % 60:02d}:{i % 60:02d}'
+        rows.append(row)
+
+    def fresh_rows():
+        # Every value gets its own str object, as a decoded Sheets API response would
+        return ([''.join(list(value)) for value in row] for row in rows)
+
+    def traced_size(build):
+        tracemalloc.start()
+        data = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del data
+        return size
+
+    dict_size = traced_size(lambda: [dict(zip(STUDENT_HEADERS, row)) for row in fresh_rows()])
+    store_size = traced_size(lambda: StudentStore.from_rows(schema, fresh_rows()))
+    scale = 10000 / count
+    print(f"List of dicts: {dict_size * scale / 1e6:.1f} MB per 10k students")
+    print(f"StudentStore:  {store_size * scale / 1e6:.1f} MB per 10k students")
+    return dict_size, store_size
+
+# --- Rendered Fragment Cache ---
+class FragmentCache:
+    """ Small LRU of rendered HTML fragments. Keys include the data version they
+    were rendered from, so a data change simply makes old entries unreachable. """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        html = render()
+        with self._lock:
+            self._entries[key] = html
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+# --- Vectorized Student Queries ---
+class StudentFrame:
+    """ Columnar NumPy copy of student records for filters, counts and sorting.
+    Works on StudentStore records or on get_projected_records() dicts; columns
+    missing from the records simply read as blank. """
+
+    def __init__(self, records):
+        self.records = list(records)
+        n = len(self.records)
+        # stage key -> int8 status codes (see STATUS_CODES, -1 for blank/unknown)
+        self.status = {
+            key: np.fromiter((STATUS_CODES.get(r.get(f'{prefix}_status'), -1) for r in self.records), dtype=np.int8, count=n)
+            for key, prefix in STAGES.items()
+        }
+        self.flagged = np.fromiter((r.get('flagged') == 'yes' for r in self.records), dtype=bool, count=n)
+        # stage key -> datetime64 timestamps (NaT when blank)
+        self.ts = {key: _to_datetimes([r.get(f'{prefix}_ts') for r in self.records]) for key, prefix in STAGES.items()}
+
+    def __len__(self):
+        return len(self.records)
+
+    def derive(self, records, sources):
+        """ Frame over `records` that copies row sources[i] of this frame where it is >= 0 and
+        reads records[i] itself where it is -1; much cheaper than a rebuild when few rows changed. """
+        if not self.records:
+            return StudentFrame(records)
+        sources = np.asarray(sources, dtype=np.intp)
+        new = np.flatnonzero(sources < 0)
+        part = StudentFrame([records[i] for i in new])
+
+        def combine(column, values):
+            combined = column[sources]
+            combined[new] = values
+            return combined
+        frame = StudentFrame.__new__(StudentFrame)
+        frame.records = list(records)
+        frame.status = {key: combine(column, part.status[key]) for key, column in self.status.items()}
+        frame.flagged = combine(self.flagged, part.flagged)
+        frame.ts = {key: combine(column, part.ts[key]) for key, column in self.ts.items()}
+        return frame
+
+    def status_is(self, stage_key, status):
+        """ Boolean mask of students whose stage has the given status. """
+        return self.status[stage_key] == STATUS_CODES[status]
+
+    def last_update(self):
+        """ Latest timestamp across all stages per student (NaT if never updated). """
+        stamps = list(self.ts.values())
+        latest = stamps[0]
+        for stamp in stamps[1:]:
+            latest = np.fmax(latest, stamp)
+        return latest
+
+    def stuck(self, now, minutes):
+        """ Mask of unfinished students whose last update is older than `minutes`. """
+        cutoff = np.datetime64(now.replace(microsecond=0)) - np.timedelta64(minutes, 'm')
+        last = self.last_update()
+        return ~self.status_is('doaa', 'Done') & ~np.isnat(last) & (last < cutoff)
+
+    def count(self, mask):
+        return int(np.count_nonzero(mask))
+
+    def group_counts(self, stage_key):
+        """ {status: count} for one stage, e.g. {'Pending': 40, 'In Queue': 7, 'Done': 12}. """
+        counts = np.bincount(self.status[stage_key] + 1, minlength=len(STATUS_VALUES) + 1)
+        return {status: int(counts[code + 1]) for status, code in STATUS_CODES.items()}
+
+    def select(self, mask, order_by=None):
+        """ Records matching the mask, optionally sorted by a stage's timestamp (oldest first). """
+        indexes = np.flatnonzero(mask)
+        if order_by:
+            indexes = indexes[np.argsort(self.ts[order_by][indexes], kind='stable')]
+        return [self.records[i] for i in indexes]
+
+def _to_datetimes(values):
+    """ Parses 'YYYY-MM-DD HH:MM:SS' strings into datetime64[s]; blanks and junk become NaT. """
+    try:
+        return np.array([v or 'NaT' for v in values], dtype='datetime64[s]')
+    except ValueError:
+        parsed = np.empty(len(values), dtype='datetime64[s]')
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = np.datetime64(value or 'NaT', 's')
+            except ValueError:
+                parsed[i] = np.datetime64('NaT')
+        return parsed
+
+# --- LHC Queue Wait Estimate ---
+QUEUE_RATE_WINDOW_MINUTES = 30  # Arrivals/completions older than this no longer count
+QUEUE_MIN_COMPLETIONS = 2       # Below this many recent completions the wait is unknown
+
+class QueueEstimator:
+    """ Estimates waits in a stage's queue (the LHC desk by default) from the recent rate
+    of completions and of arrivals into 'In Queue', over a sliding window.
+    Subscribes to a StudentCache: each change event updates one student's arrival or
+    completion time, and a full reload rebuilds both from the store. Times are kept per
+    student, so a repeated event never counts twice. Students seen only once they were
+    Done count as arriving at their completion time, since the sheet keeps one timestamp per stage. """
+
+    def __init__(self, cache, stage_key='lhc_docs', window_minutes=QUEUE_RATE_WINDOW_MINUTES):
+        self.cache, self.stage_key = cache, stage_key
+        self.window = window_minutes * 60
+        self.status_column = f'{STAGES[stage_key]}_status'
+        self.ts_column = f'{STAGES[stage_key]}_ts'
+        self.arrivals, self.completions = {}, {}  # student ID -> epoch seconds (sheet local time)
+        self._lock = threading.Lock()
+        cache.subscribe(self.on_change)
+        if cache.peek() is not None:
+            self.rebuild(cache.peek())
+
+    def rebuild(self, store):
+        frame = store.frame()
+        stamps = frame.ts[self.stage_key]
+        done = frame.status_is(self.stage_key, 'Done') & ~np.isnat(stamps)
+        queued = frame.status_is(self.stage_key, 'In Queue') & ~np.isnat(stamps)
+        seconds = stamps.astype(np.int64)
+
+        def by_student(mask):
+            return {frame.records[i].student_identifier: int(seconds[i]) for i in np.flatnonzero(mask)}
+        with self._lock:
+            self.completions = by_student(done)
+            self.arrivals = by_student(done | queued)
+            self._prune(_now_seconds())
+
+    def on_change(self, events):
+        for kind, old, new in events:
+            if kind == 'reloaded':
+                store = self.cache.peek()
+                if store is not None:
+                    self.rebuild(store)
+                continue
+            if new is None:
+                continue
+            student_id = new.student_identifier
+            before, after = old.get(self.status_column) if old else None, new.get(self.status_column)
+            if before == after:
+                continue
+            stamp = _to_datetimes([new.get(self.ts_column)])[0]
+            with self._lock:
+                if after == 'Pending':
+                    # Unmarked: the earlier queue entry or completion was a mistake
+                    self.arrivals.pop(student_id, None)
+                    self.completions.pop(student_id, None)
+                if np.isnat(stamp):
+                    continue
+                stamp = int(stamp.astype(np.int64))
+                if after == 'In Queue' or (after == 'Done' and student_id not in self.arrivals):
+                    self.arrivals[student_id] = stamp
+                if after == 'Done':
+                    self.completions[student_id] = stamp
+
+    def _prune(self, now):
+        cutoff = now - self.window
+        self.arrivals = {student_id: t for student_id, t in self.arrivals.items() if t >= cutoff}
+        self.completions = {student_id: t for student_id, t in self.completions.items() if t >= cutoff}
+
+    def estimate(self, queue_length):
+        """ Rates per hour plus expected waits in minutes: `per_position[i]` for the student at
+        position i + 1, `clear_minutes` to serve everyone queued now, and `drain_minutes`
+        until the queue is empty given new arrivals (None if it is growing or the rate is unknown). """
+        with self._lock:
+            self._prune(_now_seconds())
+            completed, arrived = len(self.completions), len(self.arrivals)
+        service_rate = completed / self.window * 3600 if completed >= QUEUE_MIN_COMPLETIONS else None
+        arrival_rate = arrived / self.window * 3600
+        if not service_rate:
+            return dict(service_per_hour=None, arrival_per_hour=round(arrival_rate, 1), minutes_per_student=None,
+                        per_position=[None] * queue_length, clear_minutes=None, drain_minutes=None, growing=None)
+        minutes_per_student = 60 / service_rate
+        return dict(
+            service_per_hour=round(service_rate, 1),
+            arrival_per_hour=round(arrival_rate, 1),
+            minutes_per_student=round(minutes_per_student, 1),
+            per_position=[round(position * minutes_per_student) for position in range(1, queue_length + 1)],
+            clear_minutes=round(queue_length * minutes_per_student),
+            drain_minutes=round(queue_length * 60 / (service_rate - arrival_rate)) if service_rate > arrival_rate else None,
+            growing=arrival_rate >= service_rate,
+        )
+
+def _now_seconds():
+    """ Current local time as epoch seconds, on the same basis as the sheet timestamps in StudentFrame. """
+    return int(np.datetime64(datetime.now().replace(microsecond=0), 's').astype(np.int64))
+
+# --- Bulk Student Actions ---
+LHC_REQUIRED_DOCS = ['10th Marksheet', '12th Marksheet', 'IAT Admit Card', 'Transfer Certificate']
+# Same action names as the single-student update_status form, plus flagging
+BULK_ACTIONS = {
+    'mark_lhc_docs_done': 'Mark LHC Done',
+    'mark_lhc_docs_queue': 'Move to LHC Queue',
+    'flag': 'Flag for Assistance',
+    'unflag': 'Remove Flag',
+    'mark_entry_done': 'Mark Entry Done',
+    'mark_hostel_done': 'Mark Hostel/Mess Done',
+    'mark_insurance_done': 'Mark Insurance Done',
+    'mark_doaa_done': 'Mark Final DoAA Done',
+}
+
+def check_student_action(student, action):
+    """ Returns None if the action may be applied to this student, otherwise the reason it can't. """
+    if action in ('flag', 'unflag'):
+        wanted = 'yes' if action == 'flag' else 'no'
+        return f"already {'flagged' if wanted == 'yes' else 'not flagged'}" if student.get('flagged') == wanted else None
+    stage_key = action[len('mark_'):].rsplit('_', 1)[0]
+    new_status = 'In Queue' if action.endswith('_queue') else 'Done'
+    current = student.get(f'{STAGES[stage_key]}_status')
+    if current == new_status:
+        return f"already {new_status}"
+    if stage_key == 'lhc_docs' and new_status == 'In Queue' and current == 'Done':
+        return "LHC registration is already Done"
+    if stage_key == 'lhc_docs' and new_status == 'Done':
+        if not all(student.get(DOC_COLUMNS[doc]) == 'yes' for doc in LHC_REQUIRED_DOCS):
+            return "required documents are not all verified"
+    if stage_key == 'doaa':
+        previous_stages = [STAGES[key] for key in ('entry', 'hostel', 'insurance', 'lhc_docs')]
+        if not all(student.get(f'{prefix}_status') == 'Done' for prefix in previous_stages):
+            return "previous stages are not all Done"
+    return None
+
+def action_changes(action, volunteer, timestamp):
+    """ {column: value} one action writes for one student. """
+    if action in ('flag', 'unflag'):
+        return {'flagged': 'yes' if action == 'flag' else 'no'}
+    prefix = STAGES[action[len('mark_'):].rsplit('_', 1)[0]]
+    new_status = 'In Queue' if action.endswith('_queue') else 'Done'
+    return {f'{prefix}_status': new_status, f'{prefix}_by': volunteer, f'{prefix}_ts': timestamp}
+
+def action_cells(sheet, row_num, action, volunteer, timestamp):
+    """ Cells one action writes for one student row. """
+    schema = get_schema(sheet)
+    return [gspread.Cell(row_num, schema.col(name), value)
+            for name, value in action_changes(action, volunteer, timestamp).items()]
+
+def write_cells(sheet, cells):
+    """ Writes scattered cells in one values.batchUpdate, one range per run of adjacent cells.
+    (update_cells would send the whole bounding rectangle.) A cell given twice keeps its last value. """
+    latest = {(cell.row, cell.col): cell for cell in cells}
+    runs = []
+    for row, col in sorted(latest):
+        if runs and runs[-1][0] == row and runs[-1][2] == col - 1:
+            runs[-1][2] = col
+            runs[-1][3].append(latest[row, col].value)
+        else:
+            runs.append([row, col, col, [latest[row, col].value]])
+    sheet.batch_update([{
+        'range': f"{gspread.utils.rowcol_to_a1(row, first)}:{gspread.utils.rowcol_to_a1(row, last)}",
+        'values': [values]
+    } for row, first, last, values in runs])
+
+def apply_student_updates(sheet, store, updates, volunteer):
+    """ Validates (student_id, action) pairs in order against the cached store, then writes all
+    accepted ones in a single batched request. Later updates see the effect of earlier ones.
+    Returns [(student_id, action, row_or_None, error_or_None)]. """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    results, accepted, pending = [], [], {}
+    for student_id, action in updates:
+        student_id = str(student_id).strip()
+        student = store.find(student_id)
+        if action not in BULK_ACTIONS:
+            error = "unknown action"
+        elif student is None:
+            error = "not found"
+        else:
+            error = check_student_action(dict(student.items(), **pending.get(student_id, {})), action)
+        results.append([student_id, action, student.row_id if student else None, error])
+        if error is None:
+            accepted.append(results[-1])
+            pending.setdefault(student_id, {}).update(action_changes(action, volunteer, timestamp))
+    if not accepted:
+        return [tuple(r) for r in results]
+
+    # Cached row numbers must still point at the same students (e.g. after a compaction)
+    rows = list(dict.fromkeys(row for _, _, row, _ in accepted))
+    id_letter = get_schema(sheet).letter('student_identifier')
+    current_ids = {row: value_range[0][0] if value_range and value_range[0] else ''
+                   for row, value_range in zip(rows, sheet.batch_get([f"{id_letter}{row}" for row in rows]))}
+    if any(current_ids[row] != student_id for student_id, _, row, _ in accepted):
+        refresh_schema(sheet) # Rows moved, or columns did: don't write with stale positions
+    cells = []
+    for result in accepted:
+        student_id, action, row, _ = result
+        if current_ids[row] != student_id:
+            result[3] = "sheet changed since it was loaded, please retry"
+        else:
+            cells += action_cells(sheet, row, action, volunteer, timestamp)
+    if cells:
+        try:
+            write_cells(sheet, cells)
+        except gspread.exceptions.APIError as e:
+            for result in accepted:
+                result[3] = result[3] or f"write failed: {e}"
+    return [tuple(r) for r in results]
+
+def apply_bulk_action(sheet, store, student_ids, action, volunteer):
+    """ Applies one action to many students in a single batched request.
+    Returns [(student_id, row_or_None, error_or_None)]. """
+    unique_ids = dict.fromkeys(str(s).strip() for s in student_ids if str(s).strip())
+    results = apply_student_updates(sheet, store, [(student_id, action) for student_id in unique_ids], volunteer)
+    return [(student_id, row, error) for student_id, _, row, error in results]
 
 # --- User Management Functions ---
 def get_all_users(sheet):
@@ -142,7 +1150,7 @@ def get_all_users(sheet):
 def find_user_row(sheet, username):
     """ Finds a user by their username in the first column. """
     try:
-        cell = sheet.find(username, in_column=1)
+        cell = sheet.find(username, in_column=get_schema(sheet).col('username'))
         return cell.row if cell else None
     except Exception: return None
 
@@ -150,7 +1158,7 @@ def add_user(sheet, username, password, role):
     """ Adds a new user to the Volunteers sheet. """
     if find_user_row(sheet, username):
         return False # User already exists
-    sheet.append_row([username, password, role])
+    sheet.append_row(get_schema(sheet).new_row({'username': username, 'password': password, 'role': role}))
     return True
 
 def update_user(sheet, original_username, new_username, new_password, new_role):
@@ -159,45 +1167,178 @@ def update_user(sheet, original_username, new_username, new_password, new_role):
         return "duplicate"
     row_num = find_user_row(sheet, original_username)
     if not row_num: return "not_found"
-    sheet.update_cell(row_num, 1, new_username)
-    sheet.update_cell(row_num, 2, new_password)
-    sheet.update_cell(row_num, 3, new_role)
+    schema = get_schema(sheet)
+    sheet.update_cells([
+        gspread.Cell(row_num, schema.col('username'), new_username),
+        gspread.Cell(row_num, schema.col('password'), new_password),
+        gspread.Cell(row_num, schema.col('role'), new_role)
+    ])
     return "success"
 
 def delete_user(sheet, username):
-    """ Deletes a user from the Volunteers sheet. """
+    """ Soft-deletes a user from the Volunteers sheet. """
     row_num = find_user_row(sheet, username)
     if not row_num: return False
-    sheet.delete_rows(row_num)
+    tombstone_row(sheet, row_num)
     return True
 
 # --- FAQ Management Functions ---
 def get_all_faqs(sheet):
-    """ Fetches all FAQs from the FAQ sheet. """
-    return get_all_records_safely(sheet, FAQ_HEADERS)
+    """ Fetches all live FAQs from the FAQ sheet, each with its stable 'row_id'. """
+    return [r for r in get_all_records_with_rows(sheet, FAQ_HEADERS) if not is_tombstone(r)]
 
 def add_faq(sheet, question, answer):
-    """ Adds a new FAQ to the sheet. """
-    sheet.append_row([question, answer])
-    return True
+    """ Adds a new FAQ to the sheet and returns its row number (None if the API didn't report it). """
+    response = sheet.append_row(get_schema(sheet).new_row({'question': question, 'answer': answer}))
+    return appended_row(response)
 
-def delete_faq(sheet, row_id):
-    """ Deletes an FAQ by its row number. """
+def delete_faq(sheet, row_id, question):
+    """ Soft-deletes an FAQ by its row number, if that row still holds the given question
+    (a compaction may have moved it since the link was rendered). """
     try:
-        sheet.delete_rows(int(row_id))
+        row_num = int(row_id)
+        if row_num < 2: return False
+        if sheet.cell(row_num, get_schema(sheet).col('question')).value != question: return False
+        tombstone_row(sheet, row_num)
         return True
     except (ValueError, gspread.exceptions.APIError):
         return False
 
+# Answers the FAQ page always carried. They are listed (and searchable) alongside the
+# sheet's FAQs unless the sheet has a question of the same wording, which then wins.
+DEFAULT_FAQS = [
+    ('What documents are required for verification at LHC?',
+     "Students need their original Class 10 & 12 mark sheets, IAT admit card, a valid photo ID (like Aadhaar or Passport), and the fee payment receipt."),
+    ("What if a student hasn't paid for health insurance?",
+     "Direct them to the designated SBI branch on campus to get the insurance first. They cannot proceed to the LHC for document verification without proof of insurance."),
+    ('What should I do if a student is missing a non-critical document?',
+     "Use the 'Add Note' function on the student's details page to record the missing document (e.g., \"Missing migration certificate\"). If the document is critical (like ID proof or mark sheets), they may need to wait for guidance from a DoSA/DoAA official."),
+    ('How do I handle a complex issue or an angry parent?',
+     "Remain calm and polite. Do not argue. Escalate the issue immediately to the senior SAC coordinator on duty at your location."),
+]
+
+DEFAULT_FAQ_QUESTIONS = {question.lower() for question, _ in DEFAULT_FAQS}
+
+def with_default_faqs(faqs):
+    """ DEFAULT_FAQS (with negative row_ids, so they list first) plus the sheet's FAQs. """
+    asked = {str(faq['question']).strip().lower() for faq in faqs}
+    defaults = [{'question': question, 'answer': answer, 'row_id': i - len(DEFAULT_FAQS)}
+                for i, (question, answer) in enumerate(DEFAULT_FAQS) if question.lower() not in asked]
+    return defaults + list(faqs)
+
+# --- FAQ Search ---
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    """ Lower-cased alphanumeric words of a text. """
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+class FaqIndex:
+    """ In-memory inverted index over FAQ questions and answers, ranked with BM25.
+    Question words count twice. Query words also match vocabulary words they are a
+    prefix of ('insur' finds 'insurance'), at a lower weight than exact matches.
+    FAQs are keyed by their stable row_id, so add/remove are incremental. Safe to
+    update while other threads search. """
+    K1, B = 1.2, 0.75
+    QUESTION_WEIGHT = 2
+    PREFIX_WEIGHT = 0.6
+    MAX_PREFIX_EXPANSIONS = 20
+    MAX_RESULTS = 50
+
+    def __init__(self, faqs=()):
+        self._lock = threading.RLock()
+        self.faqs = {}           # row_id -> faq dict
+        self.lengths = {}        # row_id -> weighted token count
+        self.postings = {}       # term -> {row_id: weighted term frequency}
+        self.vocabulary = []     # sorted terms, for prefix lookups
+        self.total_length = 0
+        for faq in faqs:
+            self.add(faq)
+
+    def all(self):
+        """ Every indexed FAQ, in row order. """
+        with self._lock:
+            return sorted(self.faqs.values(), key=lambda faq: faq['row_id'])
+
+    def add(self, faq):
+        with self._lock:
+            self._add(faq)
+
+    def remove(self, row_id):
+        with self._lock:
+            self._remove(row_id)
+
+    def _add(self, faq):
+        row_id = faq['row_id']
+        if row_id in self.faqs:
+            self._remove(row_id)
+        frequencies = Counter(tokenize(faq.get('answer', '')))
+        for term in tokenize(faq.get('question', '')):
+            frequencies[term] += self.QUESTION_WEIGHT
+        for term, frequency in frequencies.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                insort(self.vocabulary, term)
+            self.postings[term][row_id] = frequency
+        self.faqs[row_id] = faq
+        self.lengths[row_id] = sum(frequencies.values())
+        self.total_length += self.lengths[row_id]
+
+    def _remove(self, row_id):
+        faq = self.faqs.pop(row_id, None)
+        if faq is None:
+            return
+        self.total_length -= self.lengths.pop(row_id)
+        for term in set(tokenize(faq.get('question', '')) + tokenize(faq.get('answer', ''))):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(row_id, None)
+            if not posting:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary, term)]
+
+    def _expand(self, word):
+        """ Vocabulary terms for one query word: (term, weight) pairs. """
+        matches = [(word, 1.0)] if word in self.postings else []
+        start = bisect_left(self.vocabulary, word)
+        for term in self.vocabulary[start:start + self.MAX_PREFIX_EXPANSIONS + 1]:
+            if not term.startswith(word):
+                break
+            if term != word:
+                matches.append((term, self.PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query, limit=10):
+        """ Returns up to `limit` (at most MAX_RESULTS) FAQ dicts, best match first, each with a 'score'. """
+        limit = max(0, min(limit, self.MAX_RESULTS))
+        with self._lock:
+            return self._search(query, limit) if limit else []
+
+    def _search(self, query, limit):
+        count = len(self.faqs)
+        if not count:
+            return []
+        average_length = self.total_length / count
+        scores = Counter()
+        for word in set(tokenize(query)):
+            for term, weight in self._expand(word):
+                posting = self.postings[term]
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for row_id, frequency in posting.items():
+                    norm = self.K1 * (1 - self.B + self.B * self.lengths[row_id] / average_length)
+                    scores[row_id] += weight * idf * frequency * (self.K1 + 1) / (frequency + norm)
+        return [dict(self.faqs[row_id], score=round(score, 3)) for row_id, score in scores.most_common(limit)]
+
 # --- Leaderboard Function ---
-def get_volunteer_leaderboard(sheet):
-    """ Calculates the number of students processed by each volunteer. """
-    all_students = get_all_records_safely(sheet, STUDENT_HEADERS)
+def volunteer_leaderboard(all_students):
+    """ Calculates the number of students processed by each volunteer from loaded student records. """
+    by_columns = [f'{prefix}_by' for prefix in STAGES.values()]
     volunteer_updates = []
     
     for student in all_students:
-        for i in range(5):
-            volunteer = student.get(f'stage{i}_{"entry" if i==0 else "hostel" if i==1 else "insurance" if i==2 else "lhc_docs" if i==3 else "doaa"}_by')
+        for column in by_columns:
+            volunteer = student.get(column)
             if volunteer:
                 volunteer_updates.append(volunteer)
                 
@@ -231,11 +1372,7 @@ def add_student(sheet):
         print(f"⚠️ Error: A student with Application ID '{app_id}' already exists.")
         return
     student_name = input("Enter Student's Full Name: ").strip()
-    new_row_data = [
-        app_id, student_name,
-        'Pending', '', '', 'Pending', '', '', 'Pending', '', '', 'Pending', '', '', 'Pending', '', '', '', 'no'
-    ]
-    sheet.append_row(new_row_data)
+    sheet.append_row(new_student_row(sheet, app_id, student_name))
     print(f"✅ Success: Student '{student_name}' ({app_id}) has been added.")
 
 def search_and_update_student(sheet):
@@ -247,27 +1384,24 @@ def search_and_update_student(sheet):
         print(f"❌ Error: No student found with search term '{search_term}'.")
         return
     
-    student_data = sheet.row_values(row_number)
+    student = get_schema(sheet).to_record(sheet.row_values(row_number))
     
     print("\n--- Current Student Status ---")
-    print(f"  ID:   {student_data[0]}")
-    print(f"  Name: {student_data[1]}")
+    print(f"  ID:   {student['student_identifier']}")
+    print(f"  Name: {student['student_name']}")
     print("-" * 50)
     stages = ["Entry Gate", "Hostel/Mess", "Insurance", "LHC Docs", "Final DoAA"]
-    for i, stage_name in enumerate(stages):
-        status_col = 2 + (i * 3)
-        by_col = 3 + (i * 3)
-        ts_col = 4 + (i * 3)
-        status = student_data[status_col] if len(student_data) > status_col else "N/A"
-        updated_by = student_data[by_col] if len(student_data) > by_col and student_data[by_col] else ""
-        timestamp = student_data[ts_col] if len(student_data) > ts_col and student_data[ts_col] else ""
+    for stage_name, prefix in zip(stages, STAGES.values()):
+        status = student[f'{prefix}_status'] or "N/A"
+        updated_by = student[f'{prefix}_by']
+        timestamp = student[f'{prefix}_ts']
         
         if updated_by:
             print(f"  {stage_name+':':<14} {status:<10} (by {updated_by} at {timestamp})")
         else:
             print(f"  {stage_name+':':<14} {status}")
     
-    notes = student_data[17] if len(student_data) > 17 and student_data[17] else ""
+    notes = student['Notes']
     if notes:
         print(f"  {'Notes:':<14} {notes}")
     print("-" * 50)
@@ -287,11 +1421,8 @@ def search_and_update_student(sheet):
     if choice == 0: return
 
     if choice == 5:
-        entry_done = student_data[2] == 'Done'
-        hostel_done = student_data[5] == 'Done'
-        insurance_done = student_data[8] == 'Done'
-        lhc_docs_done = student_data[11] == 'Done'
-        if not (entry_done and hostel_done and insurance_done and lhc_docs_done):
+        previous_stages = [STAGES[key] for key in ('entry', 'hostel', 'insurance', 'lhc_docs')]
+        if not all(student[f'{prefix}_status'] == 'Done' for prefix in previous_stages):
             print("\n❌ ERROR: Cannot give Final DoAA approval.")
             return
 
@@ -299,7 +1430,7 @@ def search_and_update_student(sheet):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     if 1 <= choice <= 5:
-        status_col = 2 + ((choice - 1) * 3)
+        stage_key = list(STAGES)[choice - 1]
         new_status = 'Done'
         if choice == 4: # LHC Docs
             lhc_choice = input("   Enter status (a: In Queue, b: Done): ").lower()
@@ -307,16 +1438,13 @@ def search_and_update_student(sheet):
             elif lhc_choice == 'b': new_status = 'Done'
             else: print("Invalid choice."); return
         
-        cells_to_update = [
-            gspread.Cell(row_number, status_col + 1, new_status),
-            gspread.Cell(row_number, status_col + 2, volunteer_name),
-            gspread.Cell(row_number, status_col + 3, timestamp)
-        ]
-        sheet.update_cells(cells_to_update)
+        if not student_still_at(sheet, row_number, student['student_identifier']): return
+        sheet.update_cells(stage_cells(sheet, row_number, stage_key, new_status, volunteer_name, timestamp))
         print("✅ Status updated successfully.")
     elif choice == 6:
         note = input("Enter note: ").strip()
-        sheet.update_cell(row_number, 18, note)
+        if not student_still_at(sheet, row_number, student['student_identifier']): return
+        sheet.update_cell(row_number, get_schema(sheet).col('Notes'), note)
         print("✅ Note updated successfully.")
     else:
         print("Invalid choice.")
@@ -330,11 +1458,12 @@ def delete_student(sheet):
     if not row_number:
         print(f"❌ Error: No student found with Application ID '{app_id}'."); return
         
-    student_name = sheet.cell(row_number, 2).value
-    confirm = input(f"⚠️ Are you sure you want to permanently delete '{student_name}' ({app_id})? (yes/no): ").lower()
+    student_name = sheet.cell(row_number, get_schema(sheet).col('student_name')).value
+    confirm = input(f"⚠️ Are you sure you want to delete '{student_name}' ({app_id})? (yes/no): ").lower()
     
     if confirm == 'yes':
-        sheet.delete_rows(row_number)
+        if not student_still_at(sheet, row_number, app_id): return
+        tombstone_row(sheet, row_number)
         print(f"✅ Success: Record for '{app_id}' has been deleted.")
     else:
         print("Deletion cancelled.")
@@ -342,15 +1471,16 @@ def delete_student(sheet):
 def show_dashboard(sheet):
     """ Displays a live summary dashboard for the CLI. """
     print("\n--- Live Registration Dashboard ---")
-    all_records = get_all_records_safely(sheet, STUDENT_HEADERS)
+    all_records = get_projected_records(sheet, ['stage1_hostel_status', 'stage3_lhc_docs_status', 'stage4_doaa_status'])
     if not all_records: 
         print("No student data found.")
         return
 
-    total = len(all_records)
-    completed = sum(1 for r in all_records if r.get('stage4_doaa_status') == 'Done')
-    at_hostel = sum(1 for r in all_records if r.get('stage1_hostel_status') == 'Pending')
-    in_lhc_queue = sum(1 for r in all_records if r.get('stage3_lhc_docs_status') == 'In Queue')
+    frame = StudentFrame(all_records)
+    total = len(frame)
+    completed = frame.count(frame.status_is('doaa', 'Done'))
+    at_hostel = frame.count(frame.status_is('hostel', 'Pending'))
+    in_lhc_queue = frame.count(frame.status_is('lhc_docs', 'In Queue'))
 
     print(f"  Total Students in System:  {total}")
     print(f"  Process Fully Completed:   {completed} / {total}")
@@ -361,12 +1491,13 @@ def show_dashboard(sheet):
 def view_lhc_queue(sheet):
     """ Displays a list of students currently in the LHC queue for the CLI. """
     print("\n--- Students in LHC Verification Queue ---")
-    all_records = get_all_records_safely(sheet, STUDENT_HEADERS)
+    all_records = get_projected_records(sheet, ['student_identifier', 'student_name', 'stage3_lhc_docs_status', 'stage3_lhc_docs_ts'])
     if not all_records: 
         print("No student data found.")
         return
 
-    queue = [r for r in all_records if r.get('stage3_lhc_docs_status') == 'In Queue']
+    frame = StudentFrame(all_records)
+    queue = frame.select(frame.status_is('lhc_docs', 'In Queue'), order_by='lhc_docs')
     if not queue: print("The LHC queue is currently empty."); return
     for i, student in enumerate(queue, 1):
         print(f"  {i}. {student.get('student_name')} (ID: {student.get('student_identifier')})")
@@ -382,7 +1513,7 @@ def bulk_upload_students(sheet):
             new_students = []
             for row in reader:
                 if len(row) == 2:
-                    new_students.append([row[0], row[1], 'Pending', '', '', 'Pending', '', '', 'Pending', '', '', 'Pending', '', '', 'Pending', '', '', '', 'no'])
+                    new_students.append(new_student_row(sheet, row[0], row[1]))
             if new_students:
                 sheet.append_rows(new_students, value_input_option='USER_ENTERED')
                 print(f"✅ Success: {len(new_students)} students uploaded.")
@@ -392,39 +1523,29 @@ def bulk_upload_students(sheet):
 def view_flagged_students(sheet):
     """ Identifies students who have been in a stage for too long for the CLI. """
     print(f"\n--- Flagged Students (Stuck for > {STUCK_THRESHOLD_MINUTES} mins) ---")
-    all_records = get_all_records_safely(sheet, STUDENT_HEADERS)
+    ts_columns = [f'{prefix}_ts' for prefix in STAGES.values()]
+    all_records = get_projected_records(sheet, ['student_identifier', 'student_name', 'stage4_doaa_status'] + ts_columns)
     if not all_records: 
         print("No student data found.")
         return
     
-    flagged_count = 0
-    now = datetime.now()
-    for student in all_records:
-        if student.get('stage4_doaa_status') == 'Done': continue
-        
-        stage_names = ['entry', 'hostel', 'insurance', 'lhc_docs', 'doaa']
-        timestamps = [student.get(f'stage{i}_{name}_ts') for i, name in enumerate(stage_names)]
-        valid_timestamps = [ts for ts in timestamps if ts]
-        
-        if not valid_timestamps: continue
-        
-        last_update_str = max(valid_timestamps)
-        try:
-            last_update_time = datetime.strptime(last_update_str, "%Y-%m-%d %H:%M:%S")
-            if now - last_update_time > timedelta(minutes=STUCK_THRESHOLD_MINUTES):
-                print(f"  - {student.get('student_name')} (ID: {student.get('student_identifier')})")
-                flagged_count += 1
-        except (ValueError, TypeError): continue
+    frame = StudentFrame(all_records)
+    stuck = frame.select(frame.stuck(datetime.now(), STUCK_THRESHOLD_MINUTES))
+    for student in stuck:
+        print(f"  - {student.get('student_name')} (ID: {student.get('student_identifier')})")
     
-    if flagged_count == 0: print("No students are currently flagged as stuck.")
+    if not stuck: print("No students are currently flagged as stuck.")
 
 def show_volunteer_faq(faq_sheet):
     """ Displays a pre-written FAQ for the CLI. """
     print("\n--- Volunteer FAQ ---")
-    faqs = get_all_faqs(faq_sheet)
-    if not faqs:
-        print("No FAQs found.")
-        return
+    faqs = with_default_faqs(get_all_faqs(faq_sheet))
+    query = input("Search FAQs (leave blank to list all): ").strip()
+    if query:
+        faqs = FaqIndex(faqs).search(query)
+        if not faqs:
+            print(f"No FAQs match '{query}'.")
+            return
     for i, faq in enumerate(faqs, 1):
         print(f"\nQ{i}: {faq['question']}")
         print(f"A{i}: {faq['answer']}")
@@ -432,7 +1553,7 @@ def show_volunteer_faq(faq_sheet):
 def generate_end_of_day_report(sheet):
     """ Generates a summary text file of the day's activities for the CLI. """
     print("\n--- Generating End-of-Day Report ---")
-    all_records = get_all_records_safely(sheet, STUDENT_HEADERS)
+    all_records = get_projected_records(sheet, ['student_identifier', 'student_name', 'stage4_doaa_status', 'Notes'])
     if not all_records: 
         print("No student data found to generate a report.")
         return
@@ -454,9 +1575,127 @@ def generate_end_of_day_report(sheet):
         
     print(f"✅ Success: Report saved as '{report_name}'.")
 
+# --- Batch Command-Line Mode ---
+# `python backend_logic.py <command>` runs headless: one fetch of the Students sheet is
+# shared by the whole command, all writes go out in one batched request, and the result
+# is printed as JSON. Progress messages go to stderr so stdout stays machine-readable.
+def open_lines(filename):
+    """ Lines of a batch file, or of stdin when the filename is '-'. """
+    if filename == '-':
+        return sys.stdin.read().splitlines()
+    with open(filename, 'r', newline='') as f:
+        return f.read().splitlines()
+
+def batch_rows(filename):
+    """ CSV rows of a batch file, skipping blank lines and '#' comments. """
+    lines = [line for line in open_lines(filename) if line.strip() and not line.lstrip().startswith('#')]
+    return [[value.strip() for value in row] for row in csv.reader(lines)]
+
+def student_summary(student, **extra):
+    return dict(student_identifier=student.get('student_identifier'), student_name=student.get('student_name'), **extra)
+
+def batch_stats(sheet, store, args):
+    frame = store.frame()
+    return {
+        'total': len(frame),
+        'completed': frame.count(frame.status_is('doaa', 'Done')),
+        'flagged': frame.count(frame.flagged),
+        'stuck': frame.count(frame.stuck(datetime.now(), STUCK_THRESHOLD_MINUTES)),
+        'stages': {key: frame.group_counts(key) for key in STAGES},
+    }
+
+def batch_queue(sheet, store, args):
+    frame = store.frame()
+    queue = frame.select(frame.status_is('lhc_docs', 'In Queue'), order_by='lhc_docs')
+    return [student_summary(student, position=i, queued_at=student.get('stage3_lhc_docs_ts'))
+            for i, student in enumerate(queue, 1)]
+
+def batch_stuck(sheet, store, args):
+    frame = store.frame()
+    mask = frame.stuck(datetime.now(), args.minutes)
+    last = frame.last_update()[mask]
+    return [student_summary(student, last_update=str(stamp).replace('T', ' '))
+            for student, stamp in zip(frame.select(mask), last)]
+
+def batch_import(sheet, store, args):
+    """ Appends new students from CSV rows of application_id,student_name in one request. """
+    new_rows, added, skipped = [], [], []
+    for row in batch_rows(args.file):
+        app_id, student_name = (row + ['', ''])[:2]
+        if len(row) != 2 or not app_id or not student_name:
+            skipped.append({'row': row, 'reason': "expected application_id,student_name"})
+        elif app_id == TOMBSTONE or store.find(app_id) or app_id in added:
+            skipped.append({'student_identifier': app_id, 'reason': "already exists"})
+        else:
+            added.append(app_id)
+            new_rows.append(new_student_row(sheet, app_id, student_name))
+    if new_rows:
+        sheet.append_rows(new_rows, value_input_option='USER_ENTERED')
+    return {'added': added, 'skipped': skipped}
+
+def batch_apply_updates(sheet, store, args):
+    """ Applies CSV rows of student_id,action (see BULK_ACTIONS) in one batched write. """
+    updates = [(row[0], row[1] if len(row) > 1 else '') for row in batch_rows(args.file)]
+    results = apply_student_updates(sheet, store, updates, args.volunteer)
+    return {
+        'applied': sum(1 for *_, error in results if error is None),
+        'results': [{'student_identifier': student_id, 'action': action, 'row': row, 'error': error}
+                    for student_id, action, row, error in results],
+    }
+
+def batch_export(sheet, store, args):
+    return [student.to_dict() for student in store]
+
+def batch_parser():
+    parser = argparse.ArgumentParser(
+        prog='backend_logic.py', description="UDAAN volunteer CLI. Run without arguments for the interactive menu.",
+        epilog="Exit status: 0 on success, 1 if the sheet could not be loaded, 2 if some rows were rejected.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help="registration counts per stage").set_defaults(run=batch_stats)
+    commands.add_parser('queue', help="students in the LHC queue, oldest first").set_defaults(run=batch_queue)
+    stuck = commands.add_parser('stuck', help="unfinished students with no recent update")
+    stuck.add_argument('--minutes', type=int, default=STUCK_THRESHOLD_MINUTES)
+    stuck.set_defaults(run=batch_stuck)
+    importer = commands.add_parser('import', help="add students from a CSV of application_id,student_name")
+    importer.add_argument('file', help="CSV file, or '-' for stdin")
+    importer.set_defaults(run=batch_import)
+    updates = commands.add_parser('apply-updates', help="apply a CSV of student_id,action lines")
+    updates.add_argument('file', nargs='?', default='-', help="CSV file, or '-' for stdin (default)")
+    updates.add_argument('--volunteer', default='cli', help="name recorded as the updater")
+    updates.set_defaults(run=batch_apply_updates)
+    commands.add_parser('export', help="all student records").set_defaults(run=batch_export)
+    return parser
+
+def run_batch(argv):
+    """ Runs one batch command and prints its JSON result. Returns the exit status. """
+    args = batch_parser().parse_args(argv)
+    with contextlib.redirect_stdout(sys.stderr):
+        spreadsheet = connect_to_spreadsheet(SPREADSHEET_NAME)
+        try:
+            sheet = spreadsheet.worksheet("Students") if spreadsheet else None
+        except gspread.WorksheetNotFound as e:
+            print(f"❌ CRITICAL ERROR: A required worksheet was not found: {e}")
+            sheet = None
+        if not sheet or not verify_headers(sheet, STUDENT_HEADERS):
+            return 1
+    try:
+        store = StudentStore.from_rows(get_schema(sheet), sheet.get_all_values()[1:])
+        result = args.run(sheet, store, args)
+    except (OSError, gspread.exceptions.APIError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+    json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+    rejected = isinstance(result, dict) and (result.get('skipped') or any(r['error'] for r in result.get('results', [])))
+    return 2 if rejected else 0
+
 # --- Main Application Loop for Command-Line Tool ---
-def main():
-    """ The main function that runs the command-line interface menu. """
+def main(argv=None):
+    """ Runs a batch command if one is given, otherwise the interactive command-line menu. """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_batch(argv)
+
     spreadsheet = connect_to_spreadsheet(SPREADSHEET_NAME)
     if not spreadsheet: 
         time.sleep(5)
@@ -485,6 +1724,7 @@ def main():
         print("  4. Show Live Dashboard      5. View LHC Queue           6. View Flagged Students")
         print("\n--- Support & Admin ---")
         print("  7. Bulk Upload from CSV     8. Volunteer FAQs           9. Generate End-of-Day Report")
+        print("  10. Compact Deleted Rows")
         print("\n  0. Exit")
         print("="*55)
         
@@ -500,10 +1740,13 @@ def main():
         elif choice == 7: bulk_upload_students(student_sheet)
         elif choice == 8: show_volunteer_faq(faq_sheet)
         elif choice == 9: generate_end_of_day_report(student_sheet)
+        elif choice == 10:
+            compact_tombstones(student_sheet)
+            compact_tombstones(faq_sheet)
         elif choice == 0: print("Exiting program. Goodbye!"); break
         else: print("Invalid choice.")
         
         input("\nPress Enter to return to the main menu...")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
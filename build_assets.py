@@ -0,0 +1,141 @@
+""" Builds fingerprinted, precompressed copies of the static assets.
+
+Run `python build_assets.py` before deploying. Each file in ASSETS is minified,
+written to static/dist/ under a name carrying a hash of its content (so browsers
+may cache it forever), and stored alongside .gz and, when the optional `brotli`
+package is installed, .br versions. static/dist/manifest.json maps the original
+names to the built ones; app.py reads it to rewrite url_for('static', ...). """
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- Configuration ---
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR_NAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSETS = ['style.css', 'script.js']
+
+# --- Minifiers (conservative: no parser, so nothing that could change behaviour) ---
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+
+def minify_css(text):
+    """ Drops comments and redundant whitespace; strings are left untouched. """
+    parts = []
+    position = 0
+    for match in CSS_TOKENS.finditer(text):
+        parts.append(_squeeze_css(text[position:match.start()]))
+        parts.append(match.group(1) or '')
+        position = match.end()
+    parts.append(_squeeze_css(text[position:]))
+    return ''.join(parts).strip()
+
+def _squeeze_css(chunk):
+    chunk = re.sub(r'\s+', ' ', chunk)
+    chunk = re.sub(r'\s*([{};,>])\s*', r'\1', chunk)
+    chunk = re.sub(r':\s+', ':', chunk)
+    return chunk.replace(';}', '}')
+
+def minify_js(text):
+    """ Drops indentation, blank lines and comments at the start of a line (code after a
+    closing */ is kept). Line breaks are kept so automatic semicolon insertion behaves
+    as before; multi-line template literals are kept as-is. """
+    lines, in_comment, in_template = [], False, False
+    for line in text.splitlines():
+        if in_template:
+            code = line
+            lines.append(code)
+        else:
+            code, in_comment = _skip_leading_comments(line.strip(), in_comment)
+            if not code:
+                continue
+            lines.append(code)
+        if len(re.findall(r'(?<!\\)`', code)) % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+def _skip_leading_comments(code, in_comment):
+    """ Strips the comments a line starts with; returns the rest and whether a /* */ is still open. """
+    while True:
+        if in_comment:
+            end = code.find('*/')
+            if end < 0:
+                return '', True
+            code, in_comment = code[end + 2:].lstrip(), False
+        elif code.startswith('//'):
+            return '', False
+        elif code.startswith('/*'):
+            code, in_comment = code[2:], True
+        else:
+            return code, False
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+# --- Build ---
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+def source_digest(path):
+    """ Digest of a source file, recorded in the manifest to detect edits made after a build. """
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def build(static_dir=STATIC_DIR):
+    """ Rebuilds static/dist from scratch and returns the manifest. """
+    dist_dir = os.path.join(static_dir, DIST_DIR_NAME)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    os.makedirs(dist_dir)
+    manifest = {}
+    for name in ASSETS:
+        source = os.path.join(static_dir, name)
+        with open(source, 'r', encoding='utf-8') as f:
+            text = f.read()
+        stem, ext = os.path.splitext(name)
+        data = MINIFIERS.get(ext, lambda t: t)(text).encode('utf-8')
+        built_name = f"{stem}.{fingerprint(data)}{ext}"
+        built_path = os.path.join(dist_dir, built_name)
+        with open(built_path, 'wb') as f:
+            f.write(data)
+        with open(built_path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli:
+            with open(built_path + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+        manifest[name] = {'file': f"{DIST_DIR_NAME}/{built_name}", 'source': source_digest(source)}
+        print(f"✅ {name}: {len(text.encode('utf-8'))} -> {len(data)} bytes "
+              f"(gzip {os.path.getsize(built_path + '.gz')}) as {DIST_DIR_NAME}/{built_name}")
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    if not brotli:
+        print("   Note: 'brotli' is not installed; only gzip copies were written.")
+    return manifest
+
+def load_manifest(static_dir=STATIC_DIR):
+    """ {original name: built name} for every built asset whose source is unchanged since
+    the build. Missing or stale entries are left out, so those files are served unbuilt. """
+    try:
+        with open(os.path.join(static_dir, DIST_DIR_NAME, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    current = {}
+    for name, entry in manifest.items():
+        try:
+            if source_digest(os.path.join(static_dir, name)) == entry['source']:
+                current[name] = entry['file']
+            else:
+                print(f"⚠️ '{name}' changed since the last asset build; run build_assets.py. Serving it unbuilt.")
+        except (OSError, KeyError, TypeError):
+            continue
+    return current
+
+if __name__ == "__main__":
+    build(sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR)
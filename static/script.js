@@ -134,6 +134,61 @@ document.addEventListener('DOMContentLoaded', () => {
             }
         });
     }
+
+    // 8. Live FAQ Search (ranked on the server)
+    const faqSearchInput = document.getElementById('faq-search');
+    const faqList = document.getElementById('faq-list');
+    if (faqSearchInput && faqList) {
+        const initialFaqs = faqList.innerHTML;
+        let searchTimer = null;
+
+        const renderFaqs = (results) => {
+            faqList.innerHTML = '';
+            if (results.length === 0) {
+                const empty = document.createElement('div');
+                empty.className = 'empty-queue';
+                empty.innerHTML = '<h2>No FAQs match your search.</h2>';
+                faqList.appendChild(empty);
+                return;
+            }
+            results.forEach(faq => {
+                const item = document.createElement('div');
+                item.className = 'faq-item';
+                const question = document.createElement('h2');
+                question.textContent = faq.question;
+                const answer = document.createElement('p');
+                answer.textContent = faq.answer;
+                item.append(question, answer);
+                faqList.appendChild(item);
+            });
+        };
+
+        faqSearchInput.addEventListener('input', (e) => {
+            clearTimeout(searchTimer);
+            const query = e.target.value.trim();
+            searchTimer = setTimeout(() => {
+                if (!query) {
+                    faqList.innerHTML = initialFaqs;
+                    return;
+                }
+                fetch(`/faq/search?q=${encodeURIComponent(query)}`)
+                    .then(response => response.json())
+                    .then(data => renderFaqs(data.results || []))
+                    .catch(() => {});
+            }, 150);
+        });
+    }
+
+    // 9. Bulk Selection (LHC queue & student list)
+    const bulkSelectAll = document.querySelector('.bulk-select-all');
+    if (bulkSelectAll) {
+        bulkSelectAll.addEventListener('change', (e) => {
+            // Only tick rows that the live search filter left visible
+            document.querySelectorAll('.bulk-select').forEach(box => {
+                if (box.offsetParent !== null) box.checked = e.target.checked;
+            });
+        });
+    }
 });
 
 // ADD this new logic to script.js